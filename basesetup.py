@@ -3,18 +3,30 @@
 
 import os
 import lxml
-import 
 import sys
 import json
 import string
 import shutil
 import subprocess
+import hashlib
+import itertools
 import tempfile
-from distutils.dep_util import newer_group
+import threading
+import contextlib
+from importlib.util import find_spec
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import sysconfig
+# distutils was removed from the stdlib in Python 3.12. Importing setuptools
+# first makes ``distutils`` resolve to its vendored copy on every version (the
+# vendored modules import each other as ``distutils.*``, so importing
+# setuptools._distutils directly would mix two copies of the error classes).
+import setuptools  # noqa: F401
+from distutils import log
 from distutils.core import Extension
-from distutils.errors import DistutilsExecError
-from distutils.ccompiler import new_compiler
-from distutils.sysconfig import customize_compiler, get_config_vars
+from distutils.errors import (CompileError, DistutilsExecError,
+                              DistutilsSetupError, LinkError)
+from distutils.ccompiler import CCompiler, new_compiler
+from distutils.sysconfig import customize_compiler
 from distutils.command.build_ext import build_ext as _build_ext
 
 
@@ -23,22 +35,44 @@ def find_packages():
     Adapted from IPython's setupbase.py. Copyright IPython
     contributors, licensed under the BSD license.
     """
+    def walk(d):
+        # DirEntry caches d_type, so is_file()/is_dir() need no extra stat()
+        with os.scandir(d) as it:
+            entries = list(it)
+        if any(e.name == '__init__.py' and e.is_file() for e in entries):
+            yield d
+        for e in entries:
+            if e.is_dir(follow_symlinks=False) and not e.name.startswith(('.', '__')):
+                yield from walk(e.path)
+
     packages = ['mdtraj.scripts']
-    for dir,subdirs,files in os.walk('MDTraj'):
+    if not os.path.isdir('MDTraj'):
+        return packages
+    for dir in walk('MDTraj'):
         package = dir.replace(os.path.sep, '.')
-        if '__init__.py' not in files:
-            # not a package
-            continue
         packages.append(package.replace('MDTraj', 'mdtraj'))
     return packages
 
 
+_WARN_TEMPLATE = os.linesep.join([
+    '-' * 50,
+    'Warning: This package requires {import_name!r}. Try',
+    '',
+    '  $ conda install {pkg_name}',
+    '',
+    'or:',
+    '',
+    '  $ pip install {pkg_name}',
+    '-' * 50,
+])
+
+
 def check_dependencies(dependencies):
     def module_exists(dep):
+        # find_spec locates the module without executing it
         try:
-            imp.find_module(dep)
-            return True
-        except ImportError:
+            return find_spec(dep) is not None
+        except (ImportError, ValueError):
             return False
 
     for dep in dependencies:
@@ -50,48 +84,122 @@ def check_dependencies(dependencies):
             raise ValueError(dep)
 
         if not module_exists(import_name):
-            lines = [
-                '-' * 50,
-                'Warning: This package requires %r. Try' % import_name,
-                '',
-                '  $ conda install %s' % pkg_name,
-                '',
-                'or:',
-                '',
-                '  $ pip install %s' % pkg_name,
-                '-' * 50,
-            ]
-            print(os.linesep.join(lines), file=sys.stderr)
+            print(_WARN_TEMPLATE.format(import_name=import_name, pkg_name=pkg_name),
+                  file=sys.stderr)
 
 
 ################################################################################
 # Detection of compiler capabilities
 ################################################################################
 
-class CompilerDetection(object):
-    # Necessary for OSX. See https://github.com/mdtraj/mdtraj/issues/576
-    # The problem is that distutils.sysconfig.customize_compiler()
-    # is necessary to properly invoke the correct compiler for this class
-    # (otherwise the CC env variable isn't respected). Unfortunately,
-    # distutils.sysconfig.customize_compiler() DIES on OSX unless some
-    # appropriate initialization routines have been called. This line
-    # has a side effect of calling those initialzation routes, and is therefor
-    # necessary for OSX, even though we don't use the result.
-    _DONT_REMOVE_ME = get_config_vars()
+# hasfunction results are cached across builds, keyed by the compiler binary
+# (path + mtime), its full command lines and search paths, the flag
+# environment variables and the probe arguments. Set THERMOPYL_PROBE_CACHE=0
+# to neither read nor write the cache.
+PROBE_CACHE_FILE = os.path.join(
+    os.path.expanduser('~'), '.cache', 'thermopyl', 'compiler_probes.json')
+
+# Environment variables customize_compiler (and the compiler itself) honour
+_PROBE_CACHE_ENV = ('CC', 'CXX', 'CPP', 'LDSHARED', 'CFLAGS', 'CPPFLAGS',
+                    'LDFLAGS', 'ARCHFLAGS', 'INCLUDE', 'LIB')
+
+
+def _probe_cache_enabled():
+    return os.environ.get('THERMOPYL_PROBE_CACHE', '1') != '0'
+
+
+@contextlib.contextmanager
+def _file_lock(f):
+    # keeps concurrent pip invocations from clobbering each other's writes
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 
+def _quiet_spawn(cmd, **kwargs):
+    """CCompiler.spawn replacement that captures the compiler's output.
+
+    Failed feature probes are expected, so their diagnostics should not reach
+    the terminal. Raises DistutilsExecError like the stock spawn does.
+    """
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise DistutilsExecError("command %r failed: %s" % (cmd[0], e))
+    if proc.returncode != 0:
+        raise DistutilsExecError(
+            "command %r failed with exit code %d" % (cmd[0], proc.returncode))
+
+
+_SUPPORTED = 'Attempting to autodetect %-6s support... Compiler supports %s'
+_NOT_SUPPORTED = 'Attempting to autodetect %-6s support... Did not detect %s support'
+
+
+class CompilerDetection(object):
     def __init__(self, disable_openmp):
+        # customize_compiler() needs the config vars initialised (on OSX in
+        # particular, see https://github.com/mdtraj/mdtraj/issues/576);
+        # sysconfig computes and caches them once per process.
+        self._cfg = sysconfig.get_config_vars()
         cc = new_compiler()
         customize_compiler(cc)
 
         self.msvc = cc.compiler_type == 'msvc'
         self._print_compiler_version(cc)
+        self._compiler_id = self._compiler_fingerprint(cc)
+        self._probe_cache = self._load_probe_cache()
+        self._probe_cache_lock = threading.Lock()
+
+        # Each probe compiles in its own temporary directory with its own
+        # compiler instance, so they are independent and can run concurrently.
+        self._print_lock = threading.Lock()
+        self._probe_log = []
+        probes = {
+            'avx': self._detect_avx,
+            'avx2': self._detect_avx2,
+            'avx512f': self._detect_avx512f,
+            'fma': self._detect_fma,
+            'popcnt': self._detect_popcnt,
+            'aesni': self._detect_aesni,
+        }
+        if not disable_openmp:
+            probes['openmp'] = self._detect_openmp
+        if not self.msvc:
+            probes['sse3'] = self._detect_sse3
+            probes['sse41'] = self._detect_sse41
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {executor.submit(probe): name for name, probe in probes.items()}
+            results = {futures[f]: f.result() for f in as_completed(futures)}
+        self._save_probe_cache()
+        self._print_probe_log()
 
         if disable_openmp:
             self.openmp_enabled = False
         else:
-            self.openmp_enabled, openmp_needs_gomp = self._detect_openmp()
-        self.sse3_enabled = self._detect_sse3() if not self.msvc else True
-        self.sse41_enabled = self._detect_sse41() if not self.msvc else True
+            self.openmp_enabled, openmp_needs_gomp = results['openmp']
+        self.sse3_enabled = results['sse3'] if not self.msvc else True
+        self.sse41_enabled = results['sse41'] if not self.msvc else True
+        self.avx_enabled = results['avx']
+        self.avx2_enabled = results['avx2']
+        self.avx512f_enabled = results['avx512f']
+        self.fma_enabled = results['fma']
+        self.popcnt_enabled = results['popcnt']
+        self.aesni_enabled = results['aesni']
 
         self.compiler_args_sse2  = ['-msse2'] if not self.msvc else ['/arch:SSE2']
         self.compiler_args_sse3  = ['-mssse3'] if (self.sse3_enabled and not self.msvc) else []
@@ -102,6 +210,19 @@ class CompilerDetection(object):
             if not self.msvc:
                 self.compiler_args_sse41 = ['-msse4']
 
+        self.compiler_args_avx, self.define_macros_avx = self._simd_args(
+            self.avx_enabled, '__AVX__', '-mavx', '/arch:AVX')
+        self.compiler_args_avx2, self.define_macros_avx2 = self._simd_args(
+            self.avx2_enabled, '__AVX2__', '-mavx2', '/arch:AVX2')
+        self.compiler_args_avx512f, self.define_macros_avx512f = self._simd_args(
+            self.avx512f_enabled, '__AVX512F__', '-mavx512f', '/arch:AVX512')
+        self.compiler_args_fma, self.define_macros_fma = self._simd_args(
+            self.fma_enabled, '__FMA__', '-mfma', '/arch:AVX2')
+        self.compiler_args_popcnt, self.define_macros_popcnt = self._simd_args(
+            self.popcnt_enabled, '__POPCNT__', '-mpopcnt', None)
+        self.compiler_args_aesni, self.define_macros_aesni = self._simd_args(
+            self.aesni_enabled, '__AES__', '-maes', None)
+
         if self.openmp_enabled:
             self.compiler_libraries_openmp = []
 
@@ -119,8 +240,36 @@ class CompilerDetection(object):
             self.compiler_args_opt = ['/O2']
         else:
             self.compiler_args_opt = ['-O3', '-funroll-loops']
+        self.linker_args_opt = []
+
+        # Opt-in only: -march=native binaries will not run on older CPUs, so
+        # never set this for wheels. -ffast-math also changes NaN/Inf and
+        # rounding semantics; review any numeric kernel before enabling it.
+        if os.environ.get('THERMOPYL_MARCH_NATIVE', '0') == '1':
+            if self.msvc:
+                self.compiler_args_opt += ['/arch:AVX2', '/fp:fast']
+            else:
+                self.compiler_args_opt += ['-march=native', '-mtune=native',
+                                           '-ffast-math', '-fno-math-errno']
+        if os.environ.get('THERMOPYL_LTO', '0') == '1':
+            if self.msvc:
+                self.compiler_args_opt += ['/GL']
+                self.linker_args_opt += ['/LTCG']
+            else:
+                self.compiler_args_opt += ['-flto']
+                self.linker_args_opt += ['-flto']
         print()
 
+    def _simd_args(self, enabled, macro, gcc_flag, msvc_flag):
+        "Compiler flags and define macros for an optional instruction set."
+        if not enabled:
+            return [], []
+        if self.msvc:
+            args = [msvc_flag] if msvc_flag else []
+        else:
+            args = [gcc_flag]
+        return args, [(macro, 1)]
+
     def _print_compiler_version(self, cc):
         print("C compiler:")
         try:
@@ -133,13 +282,108 @@ class CompilerDetection(object):
         except DistutilsExecError:
             pass
 
+    def _compiler_fingerprint(self, cc):
+        if self.msvc:
+            exe = getattr(cc, 'cc', 'cl.exe')
+        else:
+            exe = cc.compiler[0]
+        path = shutil.which(exe) or exe
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        # Any flag change (CC="gcc -m32", -march in CFLAGS, extra include or
+        # library dirs) can flip a probe result, so all of them go in the key
+        return [cc.compiler_type, path, mtime,
+                list(getattr(cc, 'compiler', None) or []),
+                list(getattr(cc, 'linker_so', None) or []),
+                list(cc.include_dirs), list(cc.library_dirs),
+                {name: os.environ.get(name) for name in _PROBE_CACHE_ENV}]
+
+    def _load_probe_cache(self):
+        if not _probe_cache_enabled():
+            return {}
+        try:
+            with open(PROBE_CACHE_FILE) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_probe_cache(self):
+        if not _probe_cache_enabled():
+            return
+        try:
+            os.makedirs(os.path.dirname(PROBE_CACHE_FILE), exist_ok=True)
+            with open(PROBE_CACHE_FILE, 'a+') as f:
+                with _file_lock(f):
+                    f.seek(0)
+                    try:
+                        cache = json.load(f)
+                    except ValueError:
+                        cache = {}
+                    cache.update(self._probe_cache)
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(cache, f, indent=1, sort_keys=True)
+        except OSError:
+            pass
+
     def hasfunction(self, funcname, include=None, libraries=None, extra_postargs=None):
-        # running in a separate subshell lets us prevent unwanted stdout/stderr
+        key = hashlib.sha256(json.dumps(
+            [self._compiler_id, funcname, include, libraries or [], extra_postargs]
+        ).encode('utf-8')).hexdigest()
+        with self._probe_cache_lock:
+            if key in self._probe_cache:
+                return self._probe_cache[key]
+        if os.environ.get('THERMOPYL_HASFUNCTION_SUBPROCESS', '0') == '1':
+            probe = self._hasfunction_subprocess
+        else:
+            probe = self._hasfunction_inprocess
+        result = probe(funcname, include, libraries, extra_postargs)
+        with self._probe_cache_lock:
+            self._probe_cache[key] = result
+        return result
+
+    def _hasfunction_inprocess(self, funcname, include=None, libraries=None, extra_postargs=None):
+        # A fresh compiler per probe: add_library mutates it, and probes run
+        # concurrently. Building one in-process is far cheaper than starting
+        # a new interpreter and re-importing distutils.
+        cc = new_compiler()
+        customize_compiler(cc)
+        if cc.compiler_type != 'msvc':
+            # MSVC's spawn sets up its environment, so only swap in the quiet
+            # version elsewhere.
+            cc.spawn = _quiet_spawn
+        for library in libraries or []:
+            cc.add_library(library)
+
+        with tempfile.TemporaryDirectory(prefix='hasfunction-') as tmpdir:
+            src = os.path.join(tmpdir, 'func.c')
+            with open(src, 'w') as f:
+                if include is not None:
+                    f.write('#include %s\n' % include)
+                f.write('int main(void) {\n')
+                f.write('    %s;\n' % funcname)
+                f.write('}\n')
+            try:
+                objects = cc.compile([src], output_dir=tmpdir,
+                                     extra_postargs=extra_postargs)
+                cc.link_executable(objects, os.path.join(tmpdir, 'a.out'))
+            except (CompileError, LinkError):
+                return False
+        return True
+
+    def _hasfunction_subprocess(self, funcname, include=None, libraries=None, extra_postargs=None):
+        # running in a separate subshell lets us prevent unwanted stdout/stderr;
+        # kept behind THERMOPYL_HASFUNCTION_SUBPROCESS=1 for compilers that
+        # misbehave in-process
         part1 = '''
 import os
 import json
+import setuptools
 from distutils.ccompiler import new_compiler
-from distutils.sysconfig import customize_compiler, get_config_vars
+from distutils.sysconfig import customize_compiler
 
 FUNCNAME = json.loads('%(funcname)s')
 INCLUDE = json.loads('%(include)s')
@@ -152,7 +396,6 @@ EXTRA_POSTARGS = json.loads('%(extra_postargs)s')
             'extra_postargs': json.dumps(extra_postargs)}
 
         part2 = '''
-get_config_vars()  # DON'T REMOVE ME
 cc = new_compiler()
 customize_compiler(cc)
 for library in LIBRARIES:
@@ -173,60 +416,105 @@ except Exception as e:
     status = 1
 exit(status)
         '''
+        # use cwd= rather than os.chdir so concurrent probes don't race
         tmpdir = tempfile.mkdtemp(prefix='hasfunction-')
         try:
-            curdir = os.path.abspath(os.curdir)
-            os.chdir(tmpdir)
-            with open('script.py', 'w') as f:
+            with open(os.path.join(tmpdir, 'script.py'), 'w') as f:
                 f.write(part1 + part2)
             proc = subprocess.Popen(
-                [sys.executable, 'script.py'],
+                [sys.executable, 'script.py'], cwd=tmpdir,
                 stderr=subprocess.PIPE, stdout=subprocess.PIPE)
             proc.communicate()
             status = proc.wait()
         finally:
-            os.chdir(curdir)
             shutil.rmtree(tmpdir)
 
         return status == 0
 
-    def _print_support_start(self, feature):
-        print('Attempting to autodetect {0:6} support...'.format(feature), end=' ')
+    def _report_support(self, feature, status):
+        # Probes run concurrently; collect results and print them together
+        # once they are all done (see _print_probe_log).
+        with self._print_lock:
+            self._probe_log.append((feature, status))
 
-    def _print_support_end(self, feature, status):
-        if status is True:
-            print('Compiler supports {0}'.format(feature))
-        else:
-            print('Did not detect {0} support'.format(feature))
+    def _print_probe_log(self):
+        lines = []
+        for feature, status in sorted(self._probe_log):
+            template = _SUPPORTED if status is True else _NOT_SUPPORTED
+            lines.append(template % (feature, feature))
+        print('\n'.join(lines))
 
     def _detect_openmp(self):
-        self._print_support_start('OpenMP')
         hasopenmp = self.hasfunction('omp_get_num_threads()', extra_postargs=['-fopenmp', '/openmp'])
         needs_gomp = hasopenmp
         if not hasopenmp:
             hasopenmp = self.hasfunction('omp_get_num_threads()', libraries=['gomp'])
             needs_gomp = hasopenmp
-        self._print_support_end('OpenMP', hasopenmp)
+        self._report_support('OpenMP', hasopenmp)
         return hasopenmp, needs_gomp
 
     def _detect_sse3(self):
         "Does this compiler support SSE3 intrinsics?"
-        self._print_support_start('SSE3')
         result = self.hasfunction('__m128 v; _mm_hadd_ps(v,v)',
                            include='<pmmintrin.h>',
                            extra_postargs=['-msse3'])
-        self._print_support_end('SSE3', result)
+        self._report_support('SSE3', result)
         return result
 
     def _detect_sse41(self):
         "Does this compiler support SSE4.1 intrinsics?"
-        self._print_support_start('SSE4.1')
         result = self.hasfunction( '__m128 v; _mm_round_ps(v,0x00)',
                            include='<smmintrin.h>',
                            extra_postargs=['-msse4'])
-        self._print_support_end('SSE4.1', result)
+        self._report_support('SSE4.1', result)
         return result
 
+    def _detect_intrinsic(self, feature, funcname, include, gcc_flag, msvc_flag):
+        if self.msvc:
+            extra_postargs = [msvc_flag] if msvc_flag else []
+        else:
+            extra_postargs = [gcc_flag]
+        result = self.hasfunction(funcname, include=include,
+                                  extra_postargs=extra_postargs)
+        self._report_support(feature, result)
+        return result
+
+    def _detect_avx(self):
+        "Does this compiler support AVX intrinsics?"
+        return self._detect_intrinsic(
+            'AVX', '__m256 v = _mm256_setzero_ps(); _mm256_add_ps(v,v)',
+            '<immintrin.h>', '-mavx', '/arch:AVX')
+
+    def _detect_avx2(self):
+        "Does this compiler support AVX2 intrinsics?"
+        return self._detect_intrinsic(
+            'AVX2', '__m256i v = _mm256_set_epi32(0,1,2,3,4,5,6,7); _mm256_add_epi32(v,v)',
+            '<immintrin.h>', '-mavx2', '/arch:AVX2')
+
+    def _detect_avx512f(self):
+        "Does this compiler support AVX-512F intrinsics?"
+        return self._detect_intrinsic(
+            'AVX512F', '__m512i v = _mm512_set1_epi32(1); _mm512_add_epi32(v,v)',
+            '<immintrin.h>', '-mavx512f', '/arch:AVX512')
+
+    def _detect_fma(self):
+        "Does this compiler support FMA3 intrinsics?"
+        return self._detect_intrinsic(
+            'FMA', '__m256 v = _mm256_setzero_ps(); _mm256_fmadd_ps(v,v,v)',
+            '<immintrin.h>', '-mfma', '/arch:AVX2')
+
+    def _detect_popcnt(self):
+        "Does this compiler support the POPCNT intrinsic?"
+        return self._detect_intrinsic(
+            'POPCNT', '_mm_popcnt_u64(0)',
+            '<nmmintrin.h>', '-mpopcnt', None)
+
+    def _detect_aesni(self):
+        "Does this compiler support AES-NI intrinsics?"
+        return self._detect_intrinsic(
+            'AES-NI', '__m128i v = _mm_setzero_si128(); _mm_aesenc_si128(v,v)',
+            '<wmmintrin.h>', '-maes', None)
+
 ################################################################################
 # Writing version control information to the module
 ################################################################################
@@ -245,14 +533,13 @@ def git_version():
         env['LANGUAGE'] = 'C'
         env['LANG'] = 'C'
         env['LC_ALL'] = 'C'
-        out = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, env=env).communicate()[0]
-        return out
+        return subprocess.run(cmd, capture_output=True, text=True, env=env,
+                              check=False, timeout=2)
 
     try:
-        out = _minimal_ext_cmd(['git', 'rev-parse', 'HEAD'])
-        GIT_REVISION = out.strip().decode('ascii')
-    except OSError:
+        r = _minimal_ext_cmd(['git', 'rev-parse', '--short=7', 'HEAD'])
+        GIT_REVISION = r.stdout.strip() if r.returncode == 0 else 'Unknown'
+    except (OSError, subprocess.TimeoutExpired):
         GIT_REVISION = 'Unknown'
 
     return GIT_REVISION
@@ -279,7 +566,7 @@ if not release:
         GIT_REVISION = 'Unknown'
 
     if not ISRELEASED:
-        FULLVERSION += '.dev-' + GIT_REVISION[:7]
+        FULLVERSION += '.dev-' + GIT_REVISION
 
     a = open(filename, 'w')
     try:
@@ -291,6 +578,59 @@ if not release:
         a.close()
 
 
+def _is_stale(target, sources, depends):
+    """True if ``target`` is missing or older than any source or dependency.
+
+    One stat per file (newer_group's 'newer' semantics: a missing source
+    counts as newer so the build goes ahead and reports it).
+    """
+    try:
+        target_mtime = os.stat(target).st_mtime
+    except OSError:
+        return True
+    for path in itertools.chain(sources, depends):
+        try:
+            if os.stat(path).st_mtime > target_mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def _parallel_compile(compiler, sources, output_dir=None, macros=None,
+                      include_dirs=None, debug=0, extra_preargs=None,
+                      extra_postargs=None, depends=None):
+    """Drop-in for ``compiler.compile`` that builds sources concurrently.
+
+    Same approach as numpy.distutils: let the compiler work out the object
+    list, then run the per-file ``_compile`` step in a thread pool (the work
+    happens in child compiler processes, so threads are enough). Set
+    THERMOPYL_PARALLEL_BUILD=0 to force the serial ``compile``. Compilers that
+    do not override ``_compile`` (MSVC only overrides ``compile``; the base
+    ``CCompiler._compile`` is a no-op) always use the serial path.
+    """
+    serial = (os.environ.get('THERMOPYL_PARALLEL_BUILD', '1') == '0'
+              or len(sources) < 2
+              or type(compiler)._compile is CCompiler._compile)
+    if serial:
+        return compiler.compile(sources, output_dir=output_dir, macros=macros,
+                                include_dirs=include_dirs, debug=debug,
+                                extra_preargs=extra_preargs,
+                                extra_postargs=extra_postargs, depends=depends)
+
+    macros, objects, extra_postargs, pp_opts, build = compiler._setup_compile(
+        output_dir, macros, include_dirs, sources, depends, extra_postargs)
+    cc_args = compiler._get_cc_args(pp_opts, debug, extra_preargs)
+
+    def _compile_one(obj):
+        src, ext = build[obj]
+        compiler._compile(obj, src, ext, cc_args, extra_postargs, pp_opts)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        list(pool.map(_compile_one, build))
+    return objects
+
+
 class StaticLibrary(Extension):
     def __init__(self, *args, **kwargs):
         self.export_include = kwargs.pop('export_include', [])
@@ -306,8 +646,6 @@ class build_ext(_build_ext):
             _build_ext.build_extension(self, ext)
 
     def build_static_extension(self, ext):
-        from distutils import log
-
         sources = ext.sources
         if sources is None or not isinstance(sources, (list, tuple)):
             raise DistutilsSetupError(
@@ -317,8 +655,10 @@ class build_ext(_build_ext):
         sources = list(sources)
 
         ext_path = self.get_ext_fullpath(ext.name)
-        depends = sources + ext.depends
-        if not (self.force or newer_group(depends, ext_path, 'newer')):
+        output_dir, ext_file = os.path.split(ext_path)
+        libname = os.path.splitext(ext_file)[0]
+        depends = ext.depends or []
+        if not (self.force or _is_stale(ext_path, sources, depends)):
             log.debug("skipping '%s' extension (up-to-date)", ext.name)
             return
         else:
@@ -328,13 +668,14 @@ class build_ext(_build_ext):
         macros = ext.define_macros[:]
         for undef in ext.undef_macros:
             macros.append((undef,))
-        objects = self.compiler.compile(sources,
-                                         output_dir=self.build_temp,
-                                         macros=macros,
-                                         include_dirs=ext.include_dirs,
-                                         debug=self.debug,
-                                         extra_postargs=extra_args,
-                                         depends=ext.depends)
+        objects = _parallel_compile(self.compiler, sources,
+                                    output_dir=self.build_temp,
+                                    macros=macros,
+                                    include_dirs=ext.include_dirs,
+                                    debug=self.debug,
+                                    extra_postargs=extra_args,
+                                    # staleness was already checked above
+                                    depends=())
         self._built_objects = objects[:]
         if ext.extra_objects:
             objects.extend(ext.extra_objects)
@@ -342,15 +683,12 @@ class build_ext(_build_ext):
 
         language = ext.language or self.compiler.detect_language(sources)
 
-        libname = os.path.splitext(os.path.basename(ext_path))[0]
-        output_dir = os.path.dirname(ext_path)
         if (self.compiler.static_lib_format.startswith('lib') and
             libname.startswith('lib')):
             libname = libname[3:]
 
-        if not os.path.exists(output_dir):
-            # necessary for windows
-            os.makedirs(output_dir)
+        # necessary for windows
+        os.makedirs(output_dir, exist_ok=True)
 
         self.compiler.create_static_lib(objects,
             output_libname=libname,
@@ -360,5 +698,5 @@ class build_ext(_build_ext):
         for item in ext.export_include:
             shutil.copy(item, output_dir)
 
-# distutils and imp are deprecated in modern Python and should not be used.
-# This file is now obsolete for modern builds and should be removed or replaced with setuptools-only logic if needed.
+# distutils and imp are deprecated in modern Python; distutils is resolved via
+# setuptools above so this file keeps working on Python 3.12+.
@@ -7,6 +7,7 @@ import glob
 import traceback
 import numpy as np
 from os.path import join as pjoin
+from pathlib import Path
 from setuptools import setup, find_packages
 try:
     sys.dont_write_bytecode = True
@@ -28,13 +29,15 @@ ISRELEASED = True
 __version__ = VERSION
 # #########################
 
+README = Path(__file__).parent / "README.md"
+
 setup(
     name="thermopyl",
     author="Kyle Beauchamp",
     author_email="kyle.beauchamp@choderalab.org",
     description="Python tools for ThermoML",
     long_description=(
-        open("README.md").read() if os.path.exists("README.md")
+        README.read_text(encoding="utf-8") if README.exists()
         else "Python tools for ThermoML"
     ),
     long_description_content_type="text/markdown",
@@ -52,6 +55,10 @@ setup(
         "feedparser",
         "tables",
     ],
+    extras_require={
+        # Faster archive decompression in update_archive (falls back to zlib)
+        "fast": ["isal"],
+    },
     entry_points={
         "console_scripts": [
             "thermoml-update-mirror = thermopyl.scripts.update_archive:main",
@@ -1,6 +1,46 @@
 import re
-from collections import Counter
-from typing import Dict, List, Union
+from collections import defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# One token per match: an element with optional count, an opening parenthesis,
+# or a closing parenthesis with optional group multiplier.
+_FORMULA_TOKEN_RE = re.compile(r'([A-Z][a-z]?)(\d*)|(\()|\)(\d*)')
+
+
+@lru_cache(maxsize=4096)
+def _element_count_items(formula_string: str) -> Tuple[Tuple[str, int], ...]:
+    # Cached, immutable form of formula_to_element_counts; formulas repeat
+    # heavily across ThermoML records.
+    stack = []
+    counts = defaultdict(int)
+    pos = 0
+    for m in _FORMULA_TOKEN_RE.finditer(formula_string):
+        if m.start() != pos:
+            break
+        pos = m.end()
+        element, num, open_paren, multiplier = m.groups()
+        if element:
+            counts[element] += int(num) if num else 1
+        elif open_paren:
+            stack.append(counts)
+            counts = defaultdict(int)
+        else:
+            if not stack:
+                raise ValueError(f"Unbalanced ')' at position {m.start()}: {formula_string}")
+            factor = int(multiplier) if multiplier else 1
+            outer = stack.pop()
+            for k, v in counts.items():
+                outer[k] += v * factor
+            counts = outer
+    if pos != len(formula_string):
+        raise ValueError(f"Invalid formula at position {pos}: {formula_string[pos:]}")
+    if stack:
+        raise ValueError(f"Unbalanced '(' in formula: {formula_string}")
+    return tuple(counts.items())
 
 
 def formula_to_element_counts(formula_string: str) -> Dict[str, int]:
@@ -18,39 +58,7 @@ def formula_to_element_counts(formula_string: str) -> Dict[str, int]:
     dict
         Dictionary of element -> count (e.g., {'Fe': 2, 'S': 3, 'O': 12})
     """
-    
-    def multiply_counts(base: Dict[str, int], multiplier: int) -> Dict[str, int]:return {element: count * multiplier for element, count in base.items()}
-
-    def parse(tokens: str) -> Counter:
-        stack = []
-        counts = Counter()
-        i = 0
-        while i < len(tokens):
-            if tokens[i] == '(':
-                stack.append((counts, i))
-                counts = Counter()
-                i += 1
-            elif tokens[i] == ')':
-                i += 1
-                m = re.match(r'\d+', tokens[i:])
-                multiplier = int(m.group()) if m else 1
-                if m:
-                    i += len(m.group())
-                prev_counts, _ = stack.pop()
-                for k, v in counts.items():
-                    prev_counts[k] += v * multiplier
-                counts = prev_counts
-            else:
-                m = re.match(r'([A-Z][a-z]?)(\d*)', tokens[i:])
-                if not m:
-                    raise ValueError(f"Invalid formula at position {i}: {tokens[i:]}")
-                element, num = m.groups()
-                count = int(num) if num else 1
-                counts[element] += count
-                i += len(m.group())
-        return counts
-
-    return dict(parse(formula_string))
+    return dict(_element_count_items(formula_string))
 
 
 def count_atoms(formula_string: str) -> int:
@@ -67,7 +75,7 @@ def count_atoms(formula_string: str) -> int:
     int
         Total number of atoms
     """
-    return sum(formula_to_element_counts(formula_string).values())
+    return sum(count for _, count in _element_count_items(formula_string))
 
 
 def count_atoms_in_set(formula_string: str, which_atoms: List[str]) -> int:
@@ -86,8 +94,49 @@ def count_atoms_in_set(formula_string: str, which_atoms: List[str]) -> int:
     int
         Number of atoms in the specified subset
     """
-    counts = formula_to_element_counts(formula_string)
-    return sum(count for element, count in counts.items() if element in which_atoms)
+    return sum(count for element, count in _element_count_items(formula_string) if element in which_atoms)
+
+
+def count_atoms_batch(formulas: "pd.Series") -> "pd.Series":
+    """
+    Counts the total number of atoms for every formula in a Series.
+
+    Each distinct formula is parsed once and the result is mapped back onto
+    the Series, so the cost scales with the number of unique formulas.
+
+    Parameters
+    ----------
+    formulas : pandas.Series
+        Series of chemical formula strings (missing values allowed)
+
+    Returns
+    -------
+    pandas.Series
+        Nullable Int32 Series of atom counts aligned with ``formulas``
+    """
+    lookup = {f: count_atoms(f) for f in formulas.dropna().unique()}
+    return formulas.map(lookup).astype("Int32")
+
+
+def count_atoms_in_set_batch(formulas: "pd.Series", which_atoms: Iterable[str]) -> "pd.Series":
+    """
+    Counts atoms belonging to a set of elements for every formula in a Series.
+
+    Parameters
+    ----------
+    formulas : pandas.Series
+        Series of chemical formula strings (missing values allowed)
+    which_atoms : iterable of str
+        Elements to include in the count (e.g., ['C', 'H'])
+
+    Returns
+    -------
+    pandas.Series
+        Nullable Int32 Series of atom counts aligned with ``formulas``
+    """
+    which_atoms = frozenset(which_atoms)
+    lookup = {f: count_atoms_in_set(f, which_atoms) for f in formulas.dropna().unique()}
+    return formulas.map(lookup).astype("Int32")
 
 
 def get_first_entry(entry: Union[List, str]) -> str:
@@ -1,262 +1,434 @@
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
-import xmlschema
-from collections import Counter
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 
+from lxml import etree
 
-from thermopyl.core.schema import NumValuesRecord, VariableValue, PropertyValue
+from thermopyl.core.schema import (
+    NumValuesRecord, VariableValue, PropertyValue, _new_property_value, _new_variable_value,
+    VAR_KIND_OTHER, classify_var_type,
+)
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
-def get_tag(d: dict, key: str, ns: str) -> Any:
-    return d.get(key) or d.get(f"{ns}{key}") or d.get(key.replace(f"{ns}", ""))
+THERMOML_NS = "{http://www.iupac.org/namespaces/ThermoML}"
 
-def parse_thermoml_xml(file_path: str, xsd_path: str = "thermopyl/data/ThermoML.xsd") -> List[NumValuesRecord]:
+# Every ThermoML tag the parser reads, qualified once at import time so the
+# hot loops never rebuild namespaced strings.
+_TAGS = (
+    "Citation", "sDOI", "sTitle", "sPubName", "yrPubYr", "sAuthor",
+    "Compound", "RegNum", "nOrgNum", "sCommonName", "sFormulaMolec",
+    "PureOrMixtureData", "Component",
+    "Property", "nPropNumber", "Property-MethodID", "PropertyGroup",
+    "VolumetricProp", "TransportProp", "ThermodynProp", "ePropName",
+    "PropPhaseID", "ePropPhase",
+    "Variable", "nVarNumber", "VariableID", "VariableType",
+    "NumValues", "VariableValue", "nVarValue",
+    "PropertyValue", "nPropValue", "PropUncertainty", "nStdUncertValue",
+)
+_T = {tag: f"{THERMOML_NS}{tag}" for tag in _TAGS}
+_REGNUM_ORGNUM = f"{_T['RegNum']}/{_T['nOrgNum']}"
+# Property name of a <Property>, resolved in one compiled XPath call. Only
+# these property groups carry a plain ePropName; anything else is "unknown".
+_XP_PROP_NAME = etree.XPath(
+    "tml:Property-MethodID/tml:PropertyGroup"
+    "/*[self::tml:VolumetricProp or self::tml:TransportProp or self::tml:ThermodynProp]"
+    "/tml:ePropName/text()",
+    namespaces={"tml": THERMOML_NS[1:-1]},
+    smart_strings=False,
+)
+_UNKNOWN_PROP = ("unknown", "")
+_UNKNOWN_VAR = ("", None, VAR_KIND_OTHER)
+_CITATION_FIELDS = tuple((tag, _T[tag]) for tag in ("sDOI", "sTitle", "sPubName", "yrPubYr"))
+
+# Names, formulas, property names and variable types repeat across thousands
+# of records and files; share one str object per distinct value. sys.intern
+# entries are released once no record refers to them any more.
+def _intern(s: Optional[str]) -> Optional[str]:
+    return sys.intern(s) if s else s
+
+def get_tag(d: dict, key: str, ns: str = THERMOML_NS) -> Any:
+    qualified = _T.get(key) if ns == THERMOML_NS else None
+    return d.get(key) or d.get(qualified or f"{ns}{key}")
+
+@lru_cache(maxsize=4)
+def _load_schema(xsd_path: str) -> etree.XMLSchema:
+    # Compiling ThermoML.xsd is far more expensive than validating one file,
+    # so each schema is compiled once per process and shared by all files.
+    return etree.XMLSchema(etree.parse(xsd_path))
+
+# Content hashes of files that already passed schema validation. One empty
+# marker file per (schema, document) pair: creating it is atomic, so worker
+# processes and concurrent runs need no locking. Opt-in: markers are only
+# kept (and files only hashed) when THERMOPYL_CACHE_DIR is set.
+CACHE_DIR_ENV = "THERMOPYL_CACHE_DIR"
+
+def _validation_cache_dir() -> Optional[str]:
+    # Read on every call so worker processes and tests see the current value
+    root = os.environ.get(CACHE_DIR_ENV)
+    return os.path.join(os.path.expanduser(root), "validated") if root else None
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        # Hash straight from the page cache; mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+    return h.hexdigest()
+
+@lru_cache(maxsize=4)
+def _schema_digest(xsd_path: str) -> str:
+    return _file_sha256(xsd_path)[:16]
+
+def _validation_marker(file_path: str, xsd_path: str) -> Optional[str]:
+    cache_dir = _validation_cache_dir()
+    if cache_dir is None:
+        return None
+    try:
+        key = f"{_schema_digest(xsd_path)}-{_file_sha256(file_path)}"
+    except OSError:
+        return None  # let the parser report the unreadable file
+    return os.path.join(cache_dir, key)
+
+def _mark_validated(marker: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, "a").close()
+    except OSError as e:
+        logger.debug("Could not record validation result in %s: %s", marker, e)
+
+@lru_cache(maxsize=4)
+def _load_strict_schema(xsd_path: str):
+    import xmlschema
+    return xmlschema.XMLSchema(xsd_path)
+
+def _release(elem) -> None:
+    # Drop a processed top-level element and its already-seen siblings so the
+    # partially built tree stays small regardless of file size.
+    elem.clear()
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+def _parse_citation(elem) -> Dict[str, Any]:
+    citation = {}
+    for tag, qualified in _CITATION_FIELDS:
+        value = elem.findtext(qualified)
+        if value is not None:
+            citation[tag] = value.strip()
+    authors = [a.text for a in elem.iterfind(_T["sAuthor"])]
+    if authors:
+        citation["sAuthor"] = authors
+    return citation
+
+# nOrgNum values are small, dense positive integers (1..N within a file), so
+# compounds are kept in a list indexed by nOrgNum rather than a dict.
+_MAX_ORG_NUM = 1 << 16
+
+def _parse_compound(elem, compounds: List[Optional[Tuple[Optional[str], Optional[str]]]]) -> None:
+    try:
+        org_num = int(elem.findtext(_REGNUM_ORGNUM))
+        if not 0 <= org_num < _MAX_ORG_NUM:
+            raise ValueError(f"nOrgNum {org_num} out of range")
+        name = _intern(elem.findtext(_T["sCommonName"]))
+        formula = _intern(elem.findtext(_T["sFormulaMolec"]))
+        if org_num >= len(compounds):
+            compounds.extend([None] * (org_num + 1 - len(compounds)))
+        compounds[org_num] = (name, formula)
+        logger.debug("Compound %d: name=%s, formula=%s", org_num, name, formula)
+    except (TypeError, ValueError) as e:
+        logger.warning("Skipping invalid compound: %s", e)
+
+_VarInfo = Dict[int, Tuple[str, Optional[int], int]]
+_PropInfo = Dict[int, Tuple[str, Optional[str]]]
+
+def _build_rows(nv, var_info: _VarInfo, prop_info: _PropInfo) -> Tuple[List[VariableValue], List[PropertyValue]]:
+    """Assemble the variable and property values of one <NumValues> row.
+
+    This is the innermost per-datapoint loop. It is kept free of closures and
+    fully annotated so it can be compiled with mypyc if it ever dominates.
+    """
+    current_variable_values: List[VariableValue] = []
+    current_property_values: List[PropertyValue] = []
+    # Tag names as locals: these are read once per datapoint.
+    t_var_number, t_var_value = _T["nVarNumber"], _T["nVarValue"]
+    t_prop_number, t_prop_value = _T["nPropNumber"], _T["nPropValue"]
+    t_uncert, t_std_uncert = _T["PropUncertainty"], _T["nStdUncertValue"]
+
+    for vv in nv.iterfind(_T["VariableValue"]):
+        raw_number = vv.findtext(t_var_number)
+        var_value_str = vv.findtext(t_var_value)
+        if raw_number is None or var_value_str is None:
+            logger.debug("Skipping VariableValue %s: nVarValue is missing.", raw_number)
+            continue
+        try:
+            var_def_id: int = int(raw_number)
+            var_value: float = float(var_value_str)
+        except ValueError:
+            logger.debug("Skipping VariableValue %s: bad value %r", raw_number, var_value_str)
+            continue
+
+        var_label, actual_linked_org_num, var_kind = var_info.get(var_def_id, _UNKNOWN_VAR)
+
+        # Log the details of the VariableValue being created
+        logger.debug(
+            "Processing VariableValue: var_def_id=%d, raw_nVarValue='%s', "
+            "parsed_float_value=%s, final_var_label='%s', "
+            "linked_component_org_num=%s",
+            var_def_id, var_value_str, var_value, var_label, actual_linked_org_num,
+        )
+
+        current_variable_values.append(_new_variable_value(
+            var_label, (var_value,), var_def_id, actual_linked_org_num, var_kind
+        ))
+
+    for pv in nv.iterfind(_T["PropertyValue"]):
+        raw_number = pv.findtext(t_prop_number)
+        raw_value = pv.findtext(t_prop_value)
+        if raw_number is None or raw_value is None:
+            logger.debug("Skipping PropertyValue %s: nPropValue is missing.", raw_number)
+            continue
+        u_block = pv.find(t_uncert)
+        try:
+            prop_number = int(raw_number)
+            prop_value: float = float(raw_value)
+            uncertainty: Optional[float] = (
+                float(u_block.findtext(t_std_uncert) or 0.0) if u_block is not None else None
+            )
+        except ValueError:
+            logger.debug("Skipping PropertyValue %s: bad value %r", raw_number, raw_value)
+            continue
+
+        prop_name, _ = prop_info.get(prop_number, _UNKNOWN_PROP)
+        current_property_values.append(_new_property_value(
+            prop_name, (prop_value,), (str(uncertainty),) if uncertainty is not None else ()
+        ))
+
+    return current_variable_values, current_property_values
+
+def _parse_entry(
+    entry, compounds: List[Optional[Tuple[Optional[str], Optional[str]]]], citation: Dict[str, Any], file_path: str
+) -> List[NumValuesRecord]:
+    """Convert one <PureOrMixtureData> element into NumValuesRecords."""
+    # One pass over <Component>: each nOrgNum is read once and feeds both the
+    # material id and the name/formula maps. A Component without a RegNum
+    # raises here and the whole entry is skipped, as before.
+    component_ids = []
+    components = []
+    compound_formulas = {}
+    component_id_map = {}
+
+    for comp in entry.iterfind(_T["Component"]):
+        org_num = int(comp.findtext(_REGNUM_ORGNUM))
+        component_ids.append(str(org_num))
+        info = compounds[org_num] if 0 <= org_num < len(compounds) else None
+        name, formula = info if info is not None else (f"Unknown-{org_num}", "")
+        components.append(name)
+        compound_formulas[name] = formula
+        component_id_map[org_num] = formula if formula else name  # Track for matching with var_number
+
+    material_id = _intern("__".join(sorted(component_ids))) if component_ids else "unknown"
+
+    # nPropNumber -> (property name, phase), resolved once per entry
+    prop_info = {}
+    for prop in entry.iterfind(_T["Property"]):
+        try:
+            num = int(prop.findtext(_T["nPropNumber"]))
+        except (TypeError, ValueError):
+            logger.debug("Skipping property without a valid nPropNumber")
+            continue
+        names = _XP_PROP_NAME(prop)
+        name = _intern(names[0]) if names else None
+        phase_entry = prop.find(_T["PropPhaseID"])
+        phase = ""
+        if phase_entry is not None:
+            phase = _intern(phase_entry.findtext(_T["ePropPhase"]))
+        prop_info[num] = (name or "unknown", phase)
+
+    var_type_map = {}
+    var_def_to_comp_orgnum_map = {}  # New map: var_def_id -> linked_org_num
+
+    for var_def in entry.iterfind(_T["Variable"]): # Iterate over <Variable> definitions
+        variable_id_block = var_def.find(_T["VariableID"])
+        if variable_id_block is None:
+            logger.debug("Skipping variable definition without VariableID")
+            continue
+        try:
+            num = int(var_def.findtext(_T["nVarNumber"])) # This is the ID of the variable definition
+            vtype_entry = variable_id_block.find(_T["VariableType"])
+
+            # VariableType wraps a single choice element, e.g. <eTemperature>
+            if vtype_entry is not None and len(vtype_entry):
+                vtype = vtype_entry[0].text
+            elif vtype_entry is not None and vtype_entry.text and vtype_entry.text.strip():
+                vtype = vtype_entry.text
+            else:
+                vtype = "UnknownType"
+
+            var_type_map[num] = _intern(vtype)
+
+            # Check for linked component in VariableID
+            linked_org_num_str = variable_id_block.findtext(_REGNUM_ORGNUM)
+            if linked_org_num_str is not None:
+                var_def_to_comp_orgnum_map[num] = int(linked_org_num_str)
+
+        except (TypeError, ValueError) as e:
+            logger.debug("Skipping variable definition due to: %s", e)
+            continue
+
+    # Resolve each variable definition's label, linked component and kind
+    # once, so the per-row loop below is a single dict lookup. A more
+    # descriptive label is used when several variables share a type.
+    seen, duplicated = set(), set()
+    for vtype in var_type_map.values():
+        (duplicated if vtype in seen else seen).add(vtype)
+    var_info = {}
+    for num, vtype in var_type_map.items():
+        label = _intern(f"{vtype}_{num}") if vtype in duplicated else vtype
+        var_info[num] = (label, var_def_to_comp_orgnum_map.get(num), classify_var_type(label))
+
+    results = []
+    for nv in entry.iterfind(_T["NumValues"]):
+        current_variable_values, current_property_values = _build_rows(nv, var_info, prop_info)
+
+        # Create record after processing all VariableValues and PropertyValues for this NumValues block (nv)
+        # Log the collected variable values before creating the record
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Finalizing NumValuesRecord for material_id: %s with %d VariableValues and %d PropertyValues.",
+                material_id, len(current_variable_values), len(current_property_values),
+            )
+            for cv_idx, cv_val in enumerate(current_variable_values):
+                logger.debug(
+                    "  Record's VariableValue %d: var_type='%s', values=%s, var_number=%s, "
+                    "linked_component_org_num=%s",
+                    cv_idx, cv_val.var_type, cv_val.values, cv_val.var_number,
+                    cv_val.linked_component_org_num,
+                )
+
+        if current_variable_values or current_property_values: # Only create a record if there's data
+            record = NumValuesRecord(
+                material_id=str(material_id),
+                components=components, # List of component names
+                compound_formulas=compound_formulas, # Dict: name -> formula (symbol)
+                variable_values=current_variable_values,
+                property_values=current_property_values,
+                component_id_map=component_id_map, # Dict: nOrgNum -> formula (symbol)
+                source_file=file_path,
+                citation=citation
+            )
+            results.append(record)
+
+    return results
+
+def parse_thermoml_xml(
+    file_path: str, xsd_path: Optional[str] = "thermopyl/data/ThermoML.xsd", strict: bool = False
+) -> List[NumValuesRecord]:
     """
     Parse a ThermoML XML file into a list of NumValuesRecord instances.
 
+    The document is streamed with ``lxml.etree.iterparse``: each top-level
+    ``Citation``, ``Compound`` and ``PureOrMixtureData`` element is converted
+    as soon as it is complete and then freed, so memory use does not grow
+    with file size. Validation happens during the same pass. If the
+    ``THERMOPYL_CACHE_DIR`` environment variable is set, files whose content
+    hash already validated against the same schema are not re-validated;
+    markers are kept under ``$THERMOPYL_CACHE_DIR/validated``.
+
     Parameters
     ----------
     file_path : str
         Path to the XML file.
-    xsd_path : str
-        Path to the XML Schema Definition (XSD) file for validation.
+    xsd_path : str, optional
+        Path to the XML Schema Definition (XSD) file for validation. Pass
+        ``None`` to skip validation.
+    strict : bool
+        Also validate with the pure-Python ``xmlschema`` package. libxml2
+        already performs full XSD 1.0 validation, so this is only useful for
+        cross-checking the two validators; it is much slower.
 
     Returns
     -------
     List[NumValuesRecord]
         List of parsed records with compounds, variables, and properties.
     """
-
-    
-    schema = xmlschema.XMLSchema(xsd_path)
-    if not schema.is_valid(file_path):
+    schema = _load_schema(xsd_path) if xsd_path is not None else None
+    # Skip re-validating byte-identical files that passed this schema before.
+    marker = _validation_marker(file_path, xsd_path) if schema is not None else None
+    if marker is not None and os.path.exists(marker):
+        schema = None
+    if strict and xsd_path is not None and not _load_strict_schema(xsd_path).is_valid(file_path):
         raise ValueError(f"{file_path} is not valid against the provided ThermoML schema.")
 
-    data_dict = schema.to_dict(file_path)
-    # Handle case where to_dict returns (data, errors)
-    if isinstance(data_dict, tuple) and len(data_dict) == 2:
-        data_dict, _ = data_dict
-
-    ns = "{http://www.iupac.org/namespaces/ThermoML}"
+    compounds = []
+    citation = {}
+    results = []
 
-    # Unwrap root
-    if data_dict is not None and isinstance(data_dict, dict) and len(data_dict) == 1:
-        data_dict = list(data_dict.values())[0]
+    tags = (_T["Citation"], _T["Compound"], _T["PureOrMixtureData"])
+    try:
+        for _, elem in etree.iterparse(file_path, events=("end",), tag=tags, schema=schema):
+            parent = elem.getparent()
+            if parent is None or parent.getparent() is not None:
+                continue  # only direct children of the root are records
 
-    # Ensure data_dict is a dict before passing to get_tag
-    if not isinstance(data_dict, dict):
-        logger.error("Parsed XML root is not a dictionary. Cannot continue parsing.")
-        return []
+            if elem.tag == tags[0]:
+                citation = _parse_citation(elem)
+            elif elem.tag == tags[1]:
+                _parse_compound(elem, compounds)
+            else:
+                try:
+                    results.extend(_parse_entry(elem, compounds, citation, file_path))
+                except (ValueError, TypeError) as e:
+                    # Bad data in one entry (e.g. a Component without a numeric
+                    # nOrgNum); anything else is a parser bug and propagates
+                    logger.warning("Skipping entry due to error: %s", e)
+            _release(elem)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f"{file_path} is not valid against the provided ThermoML schema: {e}") from e
 
-    compounds_section = get_tag(data_dict, "Compound", ns) or []
-    pure_data_section = get_tag(data_dict, "PureOrMixtureData", ns) or []
-    if not isinstance(pure_data_section, list):
-        pure_data_section = [pure_data_section]
+    if schema is not None and marker is not None:
+        _mark_validated(marker)
+    return results
 
-    compound_map = {}
-    for compound in compounds_section:
+def _worker_init(xsd_path: Optional[str]) -> None:
+    # Compile the schema once per worker process, not once per file. A schema
+    # that cannot be loaded must not break the pool: each file then reports
+    # the error from parse_thermoml_xml, as in the serial path.
+    if xsd_path is not None:
         try:
-            org_num = int(get_tag(get_tag(compound, "RegNum", ns), "nOrgNum", ns))
-            name_entry = get_tag(compound, "sCommonName", ns)
-            name = name_entry[0] if isinstance(name_entry, list) else name_entry
-            formula = get_tag(compound, "sFormulaMolec", ns)
-            compound_map[org_num] = {"name": name, "formula": formula}
-            for k, v in compound_map.items():
-                logger.debug(f"Compound {k}: name={v.get('name')}, formula={v.get('formula')}")
-                    
-        except Exception as e:
-            logger.warning(f"Skipping invalid compound: {e}")
-    
-    citation = {}
-    citation_section = get_tag(data_dict, "Citation", ns)
-    if citation_section:
-        for tag in ["sDOI", "sTitle", "sPubName", "yrPubYr", "sAuthor"]:
-            value = get_tag(citation_section, tag, ns)
-            if value is not None:
-                citation[tag] = value.strip() if isinstance(value, str) else value
-        
-    results = []
-    for entry in pure_data_section:
-        try:
-            component_ids = [
-                str(get_tag(get_tag(c, "RegNum", ns), "nOrgNum", ns))
-                for c in get_tag(entry, "Component", ns) or []
-            ]
-            material_id = "__".join(sorted(component_ids)) if component_ids else "unknown"
-         
-            components = []
-            compound_formulas = {}
-            component_id_map = {} 
-
-            for comp in get_tag(entry, "Component", ns) or []:
-                regnum = get_tag(comp, "RegNum", ns)
-                if regnum is None or not isinstance(regnum, dict):
-                    logger.warning(f"Invalid RegNum: {regnum}")
-                    continue
-                org_num = int(get_tag(regnum, "nOrgNum", ns))
-                info = compound_map.get(org_num, {})
-                name = info.get("name", f"Unknown-{org_num}")
-                components.append(name)
-                compound_formulas[name] = info.get("formula", "")
-                component_id_map[org_num] = info.get("formula") if info.get("formula") else name  # Track for matching with var_number
-
-            prop_name_map = {}
-            prop_phase_map = {}
-            for prop in get_tag(entry, "Property", ns) or []:
-                try:
-                    num = int(get_tag(prop, "nPropNumber", ns))
-                    group = get_tag(get_tag(prop, "Property-MethodID", ns), "PropertyGroup", ns)                    
-                    group = (
-                        get_tag(group, "VolumetricProp", ns)
-                        or get_tag(group, "TransportProp", ns)
-                        or get_tag(group, "ThermodynProp", ns)
-                        or {}
-                    )
-                    name = get_tag(group, "ePropName", ns)
-                    phase_entry = get_tag(prop, "PropPhaseID", ns)
-                    phase = ""
-                    if isinstance(phase_entry, list) and phase_entry:
-                        phase = get_tag(phase_entry[0], "ePropPhase", ns)
-                    prop_name_map[num] = name or "unknown"
-                    prop_phase_map[num] = phase
-                except Exception as e:
-                    logger.debug(f"Skipping property due to: {e}")
-                    continue
-
-            var_type_map = {}
-            var_def_to_comp_orgnum_map = {}  # New map: var_def_id -> linked_org_num
-
-            for var_def in get_tag(entry, "Variable", ns) or []: # Iterate over <Variable> definitions
-                try:
-                    num = int(get_tag(var_def, "nVarNumber", ns)) # This is the ID of the variable definition
-                    variable_id_block = get_tag(var_def, "VariableID", ns)
-                    vtype_entry = get_tag(variable_id_block, "VariableType", ns)
-                    
-                    if isinstance(vtype_entry, dict):
-                        vtype = vtype_entry.get("eVarType") or vtype_entry.get("e") or list(vtype_entry.values())[0]
-                    elif isinstance(vtype_entry, str):
-                        vtype = vtype_entry
-                    else:
-                        vtype = "UnknownType"
-                   
-                    var_type_map[num] = vtype
-
-                    # Check for linked component in VariableID
-                    comp_regnum_block = get_tag(variable_id_block, "RegNum", ns)
-                    if comp_regnum_block and isinstance(comp_regnum_block, dict):
-                        linked_org_num_str = get_tag(comp_regnum_block, "nOrgNum", ns)
-                        if linked_org_num_str is not None:
-                            var_def_to_comp_orgnum_map[num] = int(linked_org_num_str)
-                            
-                except Exception as e:
-                    logger.debug(f"Skipping variable definition due to: {e}")
-                    continue
-            
-            # variable_values = [] # This line is part of existing code, ensure it's placed correctly relative to the loop below
-            # property_values = [] # This line is part of existing code
-            num_values = get_tag(entry, "NumValues", ns) or []
-            num_values = num_values if isinstance(num_values, list) else [num_values]
-           
-            # Count occurrences of each variable type
-            vtype_counts = Counter(var_type_map.values())
-
-            for nv in num_values:
-                # Reset lists for each NumValues block if they are supposed to be specific to it
-                # If variable_values and property_values are cumulative for the entry, initialize them before this loop.
-                # Based on current structure, they seem cumulative for the NumValues block, then a record is made.
-                # Let's assume they are re-initialized for each record that will be appended.
-                current_variable_values = []
-                current_property_values = []
-
-                for vv in get_tag(nv, "VariableValue", ns) or []:
-                    try:
-                        var_def_id = int(get_tag(vv, "nVarNumber", ns))
-                        var_value_str = get_tag(vv, "nVarValue", ns) # Keep as string initially for logging
-                        if var_value_str is None:
-                            logger.debug(f"Skipping VariableValue with var_def_id {var_def_id}: nVarValue is None.")
-                            continue
-                        
-                        var_value = float(var_value_str) # Convert to float after ensuring it's not None
-                        
-                        vtype = var_type_map.get(var_def_id, "")
-                        # Use a more descriptive label if multiple variables have the same type
-                        # This logic was already present, just ensuring it's clear
-                        if vtype_counts[vtype] > 1:
-                            var_label = f"{vtype}_{var_def_id}"
-                        else:
-                            var_label = vtype
-                        
-                        actual_linked_org_num = var_def_to_comp_orgnum_map.get(var_def_id)
-                        
-                        # Log the details of the VariableValue being created
-                        logger.debug(
-                            f"Processing VariableValue: var_def_id={var_def_id}, "
-                            f"raw_nVarValue='{var_value_str}', parsed_float_value={var_value}, "
-                            f"vtype='{vtype}', final_var_label='{var_label}', "
-                            f"linked_component_org_num={actual_linked_org_num}"
-                        )
-
-                        current_variable_values.append(VariableValue(
-                            var_type=var_label,
-                            values=[var_value],
-                            var_number=var_def_id,
-                            linked_component_org_num=actual_linked_org_num
-                        ))
-                    except Exception as e:
-                        logger.debug(f"Skipping VariableValue due to: {e} (raw data: {get_tag(vv, 'nVarValue', ns)})")
-                        continue
-
-                for pv in get_tag(nv, "PropertyValue", ns) or []:
-                    try:
-                        prop_number = int(get_tag(pv, "nPropNumber", ns))
-                        prop_value = float(get_tag(pv, "nPropValue", ns))
-
-                        uncertainty = None
-                        u_block = get_tag(pv, "PropUncertainty", ns)
-                        if isinstance(u_block, list) and u_block:
-                            uncertainty = float(get_tag(u_block[0], "nStdUncertValue", ns) or 0.0)
-                        elif isinstance(u_block, dict):
-                            uncertainty = float(get_tag(u_block, "nStdUncertValue", ns) or 0.0)
-
-                        current_property_values.append(PropertyValue(
-                            prop_name=prop_name_map.get(prop_number, "unknown"),
-                            values=[prop_value],
-                            uncertainties=[str(uncertainty)] if uncertainty is not None else []
-                        ))
-                    except Exception as e:
-                        logger.debug(f"Skipping PropertyValue due to: {e}")
-                        continue
-
-                # Create record after processing all VariableValues and PropertyValues for this NumValues block (nv)
-                # Log the collected variable values before creating the record
-                logger.debug(f"Finalizing NumValuesRecord for material_id: {material_id} with {len(current_variable_values)} VariableValues and {len(current_property_values)} PropertyValues.")
-                for cv_idx, cv_val in enumerate(current_variable_values):
-                    logger.debug(
-                        f"  Record's VariableValue {cv_idx}: "
-                        f"var_type='{cv_val.var_type}', "
-                        f"values={cv_val.values}, "
-                        f"var_number={cv_val.var_number}, "
-                        f"linked_component_org_num={cv_val.linked_component_org_num}"
-                    )
-                
-                if current_variable_values or current_property_values: # Only create a record if there's data
-                    record = NumValuesRecord(
-                        material_id=str(material_id),
-                        components=components, # List of component names
-                        compound_formulas=compound_formulas, # Dict: name -> formula (symbol)
-                        variable_values=current_variable_values,
-                        property_values=current_property_values,
-                        component_id_map=component_id_map, # Dict: nOrgNum -> formula (symbol)
-                        source_file=file_path,
-                        citation=citation
-                    )
-                    results.append(record)
-
-        except Exception as e:
-            logger.warning(f"Skipping entry due to error: {e}")
-            continue
+            _load_schema(xsd_path)
+        except (OSError, etree.Error) as e:
+            logger.debug("Could not preload schema %s: %s", xsd_path, e)
 
-    return results
+def parse_many(
+    paths: Iterable[str],
+    xsd_path: Optional[str] = "thermopyl/data/ThermoML.xsd",
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+) -> Iterator[List[NumValuesRecord]]:
+    """
+    Parse many ThermoML files in parallel worker processes.
+
+    Yields one list of records per input path, in input order. An invalid
+    file raises ``ValueError`` just like :func:`parse_thermoml_xml`.
+
+    Parameters
+    ----------
+    paths : iterable of str
+        Paths to the XML files.
+    xsd_path : str, optional
+        Schema used for validation; compiled once per worker.
+    workers : int, optional
+        Number of worker processes (defaults to ``os.cpu_count()``).
+    chunksize : int
+        Number of files handed to a worker at a time, to amortize IPC.
+    """
+    worker = partial(parse_thermoml_xml, xsd_path=xsd_path)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init, initargs=(xsd_path,)) as ex:
+        yield from ex.map(worker, paths, chunksize=chunksize)
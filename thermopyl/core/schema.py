@@ -1,22 +1,78 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 
+# __slots__ dataclasses (no per-instance __dict__) need Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+# Integer tags for the variable types alloy normalization dispatches on,
+# so the per-variable check is an int compare rather than a prefix match.
+VAR_KIND_OTHER = 0
+VAR_KIND_MOLE_FRACTION = 1
+VAR_KIND_MASS_FRACTION = 2
+
+
+def classify_var_type(var_type: str) -> int:
+    if var_type.startswith("Mole fraction"):
+        return VAR_KIND_MOLE_FRACTION
+    if var_type.startswith("Mass fraction"):
+        return VAR_KIND_MASS_FRACTION
+    return VAR_KIND_OTHER
+
+
+@dataclass(**_SLOTS)
 class VariableValue:
     var_type: str
-    values: List[float]
+    values: Sequence[float]  # the parser stores a 1-tuple
     var_number: Optional[int] = None  # Existing field, ensure it's kept
     linked_component_org_num: Optional[int] = None # New field
+    var_kind: Optional[int] = None  # derived from var_type when not given
+
+    def __post_init__(self):
+        if self.var_kind is None:
+            self.var_kind = classify_var_type(self.var_type)
+
+    @property
+    def value(self) -> float:
+        return self.values[0]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PropertyValue:
     prop_name: str
-    values: List[float]
-    uncertainties: List[Optional[str]]
+    values: Sequence[float]
+    uncertainties: Sequence[Optional[str]]
+
+    @property
+    def value(self) -> float:
+        return self.values[0]
+
+# Unchecked positional constructors for the parser's innermost loop. They
+# bypass the generated keyword __init__ (about 2.5x faster per instance) and
+# must set every field; keep them in sync with the classes above.
+_new = object.__new__
+
+
+def _new_variable_value(var_type, values, var_number, linked_component_org_num, var_kind):
+    obj = _new(VariableValue)
+    obj.var_type = var_type
+    obj.values = values
+    obj.var_number = var_number
+    obj.linked_component_org_num = linked_component_org_num
+    obj.var_kind = var_kind
+    return obj
+
+
+def _new_property_value(prop_name, values, uncertainties):
+    obj = _new(PropertyValue)
+    obj.prop_name = prop_name
+    obj.values = values
+    obj.uncertainties = uncertainties
+    return obj
+
 
-@dataclass
+@dataclass(**_SLOTS)
 class NumValuesRecord:
     material_id: str
     components: List[str]
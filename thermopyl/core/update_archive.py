@@ -1,12 +1,39 @@
+import io
 import os
+import hashlib
 import re
 import tarfile
+import time
 import gzip
 import shutil
+import tempfile
 import requests
 import json # Added import
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urlsplit, urljoin
+from requests.adapters import HTTPAdapter
+
+# Optional faster inflate for the archive: ISA-L (SIMD Huffman decode and
+# CRC) or zlib-ng are typically 2-4x quicker than the stdlib zlib.
+try:
+    from isal import igzip as _fast_gzip
+except ImportError:
+    try:
+        from zlib_ng import gzip_ng as _fast_gzip
+    except ImportError:
+        _fast_gzip = None
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Optional faster JSON decoding for the NERDm record; orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so error handling is unchanged.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 NIST_PAGE_URL = "https://data.nist.gov/od/id/mds2-2422"
 FALLBACK_ARCHIVE_URL = "https://data.nist.gov/od/ds/mds2-2422/ThermoML.v2020-09-30.tgz"
@@ -15,43 +42,289 @@ FALLBACK_REVISION_DATE = "2020-09-30"
 
 DOI_URL = "https://doi.org/10.18434/MDS2-2422"
 
-def safe_extract(tar: tarfile.TarFile, path: Path = Path(".")):
-    """Safely extract tarball to prevent path traversal attacks."""
-    # Convert path to string for os.path.abspath checks, as it requires strings.
-    # tar.extractall can handle Path objects directly.
-    path_abs_str = str(path.resolve()) 
-    for member in tar.getmembers():
-        # Resolve the member path to an absolute path for comparison
-        member_path_abs = (path / member.name).resolve()
-        if not str(member_path_abs).startswith(path_abs_str):
-            raise Exception(f"Attempted Path Traversal in Tar File: {member.name}")
-    tar.extractall(path)
-
-def download_file(url, dest_path, chunk_size=8192):
-    """Download a file with error handling."""
-    response = requests.get(url, stream=True, timeout=(10, 300))  # (connect timeout, read timeout)
-    response.raise_for_status()
-    with open(dest_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            f.write(chunk)
-
-def resolve_archive_url():
+# Touched after a complete extraction; lets the cache checks trust the tree
+# without walking it.
+EXTRACTION_SENTINEL = ".extraction_complete"
+
+def _make_session():
+    """Shared HTTP session so metadata and archive requests reuse connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_SESSION = _make_session()
+
+def _check_member(member, base):
+    """Reject members that would land (or link) outside ``base``.
+
+    ``base`` is the resolved destination with a trailing separator, so the
+    check is purely lexical and a sibling such as "<path>-evil" cannot pass
+    the prefix test.
+    """
+    # normpath drops the trailing separator, so "./" maps to base itself
+    target = os.path.join(os.path.normpath(os.path.join(base, member.name)), "")
+    if os.path.isabs(member.name) or not target.startswith(base):
+        raise Exception(f"Attempted Path Traversal in Tar File: {member.name}")
+    if member.issym() or member.islnk():
+        # Symlink targets are relative to the link's directory, hardlink
+        # targets to the archive root
+        link_dir = os.path.dirname(target.rstrip(os.sep)) if member.issym() else base
+        link_target = os.path.join(os.path.normpath(os.path.join(link_dir, member.linkname)), "")
+        if os.path.isabs(member.linkname) or not link_target.startswith(base):
+            raise Exception(f"Attempted Path Traversal in Tar File: {member.name} -> {member.linkname}")
+    return member
+
+def _write_member(base, member, data):
+    target = os.path.join(base, member.name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(data)
+    if member.mode is not None:
+        os.chmod(target, member.mode)
+    os.utime(target, (member.mtime, member.mtime))
+
+def safe_extract(tar: tarfile.TarFile, path: Path = Path("."), workers=4):
+    """Safely extract tarball to prevent path traversal attacks.
+
+    Members are checked and extracted one at a time so this also works on
+    streaming (``r|*``) archives, which cannot seek back to re-read members.
+    Interpreters with PEP 706 extraction filters (3.12, and 3.8.17/3.9.17/
+    3.10.12/3.11.4 backports) vet members with the stdlib ``"data"`` filter,
+    which additionally rejects device nodes and unsafe permission bits.
+
+    Decompression has to stay on this thread, but regular files are written
+    by a pool of ``workers`` threads so disk writes overlap with inflating
+    the next member. As with ``extractall``, a later member with the same
+    name wins, and directory attributes (mtime, mode) are applied last so
+    writing their contents does not undo them.
+    """
+    base = os.path.join(os.path.realpath(path), "")
+    data_filter = getattr(tarfile, "data_filter", None)
+    if data_filter is not None:
+        check, extract_kwargs = data_filter, {"filter": "fully_trusted"}  # already filtered
+    else:
+        check, extract_kwargs = _check_member, {}
+    max_pending = 4 * workers  # bounds the decompressed bytes held in memory
+    directories = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        writing = {}  # target path -> future of its latest queued write
+        for member in tar:
+            member = check(member, base)
+            if member.isreg():
+                target = os.path.normpath(os.path.join(base, member.name))
+                earlier = writing.get(target)
+                if earlier is not None:
+                    earlier.result()  # a duplicate name: keep archive order
+                data = tar.extractfile(member).read()
+                future = pool.submit(_write_member, base, member, data)
+                writing[target] = future
+                pending.append(future)
+                if len(pending) > max_pending:
+                    pending.popleft().result()
+                continue
+            if member.isdir():
+                tar.extract(member, path, set_attrs=False, **extract_kwargs)
+                directories.append(member)
+                continue
+            # Links go through tarfile; a hardlink's target must be on disk
+            # (and a replaced file finished) first, so finish the queued writes
+            while pending:
+                pending.popleft().result()
+            writing.clear()
+            tar.extract(member, path, **extract_kwargs)
+        while pending:
+            pending.popleft().result()
+
+    # Deepest first, so setting a child's mtime cannot touch its parent's
+    directories.sort(key=lambda m: m.name, reverse=True)
+    for member in directories:
+        dirpath = os.path.join(base, member.name)
+        tar.chown(member, dirpath, False)
+        tar.utime(member, dirpath)
+        tar.chmod(member, dirpath)
+
+# Response header -> request header used to revalidate a cached download
+_VALIDATORS = (("ETag", "If-None-Match"), ("Last-Modified", "If-Modified-Since"))
+
+def conditional_headers(archive_info):
+    """Build If-None-Match/If-Modified-Since headers from a saved archive_info dict."""
+    headers = {}
+    for response_header, request_header in _VALIDATORS:
+        value = archive_info.get(response_header)
+        if value:
+            headers[request_header] = value
+    return headers
+
+def _validators(response):
+    return {name: response.headers.get(name) for name, _ in _VALIDATORS}
+
+def _not_modified(response, conditional_headers):
+    """True for a 304, or a 200 whose validators match the ones we sent.
+
+    Some servers ignore If-None-Match/If-Modified-Since but still report the
+    same ETag/Last-Modified; the body can then be skipped unread.
+    """
+    if response.status_code == 304:
+        return True
+    if not conditional_headers or response.status_code != 200:
+        return False
+    return any(
+        conditional_headers.get(request_header) is not None
+        and response.headers.get(response_header) == conditional_headers[request_header]
+        for response_header, request_header in _VALIDATORS
+    )
+
+def _load_archive_info(archive_info_file):
+    """Previously saved archive_info.json contents, or {} if missing/unreadable."""
+    try:
+        with open(archive_info_file, 'r') as jf:
+            return json.load(jf)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Cache read error: {e}. Will fetch new data.")
+        return {}
+
+def download_file(url, dest_path, chunk_size=1 << 20, conditional_headers=None):
+    """Download a file with error handling.
+
+    Returns the response's ETag/Last-Modified headers, or None if the file is
+    unchanged according to ``conditional_headers`` (nothing is written).
+    """
+    with _SESSION.get(url, stream=True, timeout=(10, 300), headers=conditional_headers) as response:  # (connect timeout, read timeout)
+        if _not_modified(response, conditional_headers):
+            return None
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with open(dest_path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, chunk_size)
+        return _validators(response)
+
+class _HashingReader(io.RawIOBase):
+    """Raw stream wrapper that feeds every byte read through ``digest``."""
+
+    def __init__(self, raw, digest):
+        self._raw = raw
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self._raw.readinto(b)
+        if n:
+            self.digest.update(memoryview(b)[:n])
+        return n
+
+def _archive_sha256(repository_metadata, archive_url):
+    """SHA-256 published in NERDm for ``archive_url``, or None."""
+    dist = (repository_metadata or {}).get('distribution', [])
+    for d in dist if isinstance(dist, list) else [dist]:
+        if isinstance(d, dict) and d.get('downloadURL') == archive_url:
+            checksum = d.get('checksum') or {}
+            algorithm = checksum.get('algorithm') or {}
+            if str(algorithm.get('tag', '')).lower() == 'sha256' and checksum.get('hash'):
+                return checksum['hash'].lower()
+    return None
+
+def _install_tree(staging, dest_dir):
+    """Move the top-level entries of ``staging`` over those in ``dest_dir``.
+
+    Each entry is swapped in with ``os.replace``; entries of ``dest_dir`` that
+    the archive does not contain (archive_info.json, RSS downloads) are kept.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    replaced = Path(tempfile.mkdtemp(prefix=".replaced-", dir=staging.parent))
+    try:
+        for entry in staging.iterdir():
+            target = dest_dir / entry.name
+            if target.exists() or target.is_symlink():
+                os.replace(target, replaced / entry.name)
+            os.replace(entry, target)
+    finally:
+        shutil.rmtree(replaced, ignore_errors=True)
+
+def download_and_extract(url, dest_dir, conditional_headers=None, expected_sha256=None):
+    """Stream a (compressed) tarball from ``url`` and extract it into ``dest_dir``.
+
+    The response body is fed to tarfile in streaming mode, so the archive is
+    decompressed and extracted while it downloads and never staged on disk.
+    Returns the response's ETag/Last-Modified headers plus the archive's
+    ``sha256``, or None if the archive is unchanged according to
+    ``conditional_headers`` (nothing is extracted). The digest is taken over
+    the bytes as they stream past, so members are first extracted into a
+    sibling temporary directory and only moved into ``dest_dir`` once the
+    digest matches ``expected_sha256``; on a mismatch (ValueError) the
+    previous tree is left untouched.
+    """
+    dest_dir = Path(dest_dir)
+    with _SESSION.get(url, stream=True, timeout=(10, 300), headers=conditional_headers) as response:  # (connect timeout, read timeout)
+        if _not_modified(response, conditional_headers):
+            return None
+        response.raise_for_status()
+        response.raw.decode_content = True
+        # urllib3 closes the raw stream at EOF by default; keep it readable
+        # until the trailing bytes have been drained into the digest below
+        response.raw.auto_close = False
+        hashed = _HashingReader(response.raw, hashlib.sha256())
+        stream = io.BufferedReader(hashed, 1 << 20)
+        dest_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{dest_dir.name}-extract-", dir=dest_dir.parent))
+        try:
+            if _fast_gzip is not None and stream.peek(2)[:2] == _GZIP_MAGIC:
+                with _fast_gzip.open(stream, "rb") as gz, tarfile.open(fileobj=gz, mode="r|") as tar:
+                    safe_extract(tar, staging)
+            else:
+                with tarfile.open(fileobj=stream, mode="r|*") as tar:
+                    safe_extract(tar, staging)
+            # tarfile stops at the end-of-archive marker; hash the padding too
+            while stream.read(1 << 20):
+                pass
+            sha256 = hashed.digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                raise ValueError(f"SHA-256 mismatch for {url}: expected {expected_sha256}, got {sha256}")
+            _install_tree(staging, dest_dir)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return {**_validators(response), "sha256": sha256}
+
+def resolve_archive_url(cached_info=None):
+    """Resolve the archive URL, version and revision date from NERDm metadata.
+
+    ``cached_info`` is a previously saved archive_info.json dict; its NERDm
+    validators are sent so an unchanged record comes back as a 304 and the
+    cached ``repositoryMetadata`` is reused. Returns ``(archive_url, version,
+    revision_date, repository_metadata, nerdm_validators)``.
+    """
     archive_url = None
     archive_version = None
     archive_revision_date = None
     repository_metadata = None
+    nerdm_validators = None
+    cached_info = cached_info or {}
+    cached_metadata = cached_info.get("repositoryMetadata")
+    request_headers = conditional_headers(cached_info.get("nerdmValidators") or {}) if cached_metadata else {}
 
     # Only fetch metadata from the NERDm repository (fallback ark ID URL)
     nerdm_fallback_url = "https://data.nist.gov/od/id/ark:/88434/mds2-2422?format=nerdm"
     try:
         print(f"Attempting to fetch NERDm metadata from: {nerdm_fallback_url}")
-        fallback_resp = requests.get(nerdm_fallback_url, timeout=(10, 60))
-        fallback_resp.raise_for_status()
-        if 'application/json' in fallback_resp.headers.get('Content-Type', ''):
-            repository_metadata = fallback_resp.json()
-            print("✅ Fetched NERDm repository metadata from fallback ark ID URL.")
+        fallback_resp = _SESSION.get(nerdm_fallback_url, timeout=(10, 60), headers=request_headers)
+        if fallback_resp.status_code == 304:
+            repository_metadata = cached_metadata
+            nerdm_validators = cached_info["nerdmValidators"]
+            print("✅ NERDm repository metadata not modified; using cached copy.")
         else:
-            print("⚠️ Fallback ark ID URL did not return JSON.")
+            fallback_resp.raise_for_status()
+            if 'application/json' in fallback_resp.headers.get('Content-Type', ''):
+                repository_metadata = _json_loads(fallback_resp.content)
+                nerdm_validators = _validators(fallback_resp)
+                print("✅ Fetched NERDm repository metadata from fallback ark ID URL.")
+            else:
+                print("⚠️ Fallback ark ID URL did not return JSON.")
     except requests.exceptions.RequestException as fallback_err:
         print(f"⚠️ Fallback request for NERDm metadata failed: {fallback_err}")
     except json.JSONDecodeError as fallback_jexc:
@@ -59,12 +332,11 @@ def resolve_archive_url():
 
     # --- NERDm metadata parsing and override logic ---
     if repository_metadata:
-        import datetime
         nerdm_version = repository_metadata.get('version')
         nerdm_issued = repository_metadata.get('issued')
         nerdm_modified = repository_metadata.get('modified')
         nerdm_title = repository_metadata.get('title')
-        retrieved_date = datetime.datetime.utcnow().isoformat() + 'Z'
+        retrieved_date = datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
         repository_metadata['retrieved'] = retrieved_date
         print(f"NERDm metadata found:")
         print(f"  title: {nerdm_title}")
@@ -83,13 +355,11 @@ def resolve_archive_url():
         # Try to get the archive URL from the NERDm metadata if present
         # (If not, fallback to the known static URL)
         dist = repository_metadata.get('distribution', [])
-        if isinstance(dist, list):
-            for d in dist:
-                if isinstance(d, dict) and d.get('downloadURL', '').endswith('.tgz'):
-                    archive_url = d['downloadURL']
-                    break
-        elif isinstance(dist, dict) and dist.get('downloadURL', '').endswith('.tgz'):
-            archive_url = dist['downloadURL']
+        archive_url = next(
+            (d['downloadURL'] for d in (dist if isinstance(dist, list) else [dist])
+             if isinstance(d, dict) and d.get('downloadURL', '').endswith('.tgz')),
+            None,
+        )
     # Fallback to known static URL if not found in NERDm
     if not archive_url:
         archive_url = FALLBACK_ARCHIVE_URL
@@ -98,7 +368,27 @@ def resolve_archive_url():
     if not archive_revision_date:
         archive_revision_date = FALLBACK_REVISION_DATE
 
-    return archive_url, archive_version, archive_revision_date, repository_metadata
+    return archive_url, archive_version, archive_revision_date, repository_metadata, nerdm_validators
+
+def _print_summary(thermoml_path, data, archive_source=None):
+    """Print the end-of-run report from an archive_info dict ({} if none was saved)."""
+    if data.get("repositoryMetadata"):
+        metadata_status = "saved to archive_info.json"
+    elif data:
+        metadata_status = "not found during fetch, see archive_info.json"
+    else:
+        metadata_status = "not found or not saved"
+    print(f"\n✅ Update complete.")
+    print(f"🗂 Archive path: {thermoml_path}")
+    if archive_source:
+        print(f"📦 Archive Source: {archive_source}")
+    print(f"🔗 Archive URL Used: {data.get('archiveURL', 'unknown')}")
+    print(f"📜 Archive Version: {data.get('version', 'unknown')}")
+    print(f"🗓️ Archive Revision Date: {data.get('revisionDate', 'unknown')}")
+    print(f"📄 Repository Metadata: {metadata_status}")
+    print(f"📄 XML files available: {data.get('xmlFileCount', 'unknown')}")
+    print("💡 Tip: You can override the archive URL, version, and revision date with environment variables:")
+    print("   THERMOML_ARCHIVE_URL, THERMOML_ARCHIVE_VERSION, THERMOML_ARCHIVE_REVISION_DATE")
 
 def update_archive(thermoml_path=None):
     if thermoml_path is None:
@@ -112,38 +402,27 @@ def update_archive(thermoml_path=None):
     archive_version = None
     archive_revision_date = None
     repository_metadata = None # Initialize
+    nerdm_validators = None
 
     # Check cache before downloading (moved from resolve_archive_url)
     archive_info_file = thermoml_path / "archive_info.json"
     cache_dir = thermoml_path
-    import time
-    if archive_info_file.exists():
+    sentinel = thermoml_path / EXTRACTION_SENTINEL
+    previous_info = _load_archive_info(archive_info_file)
+    if previous_info:
         try:
             mtime = archive_info_file.stat().st_mtime
-            xml_files = list(cache_dir.rglob("*.xml"))
-            print(f"[DEBUG] Found {len(xml_files)} XML files in cache dir {cache_dir}")
-            if (time.time() - mtime) < 24*3600 and xml_files:
-                with open(archive_info_file, 'r') as jf:
-                    data = json.load(jf)
-                if all(k in data for k in ("archiveURL", "version", "revisionDate")):
+            extracted = sentinel.exists()
+            print(f"[DEBUG] Extraction sentinel in cache dir {cache_dir}: {extracted}")
+            now = time.time()
+            if (now - mtime) < 24*3600 and extracted:
+                if all(k in previous_info for k in ("archiveURL", "version", "revisionDate")):
                     print(f"Using cached archive info and XML files from {cache_dir}")
-                    final_url = data.get("archiveURL", "unknown")
-                    final_version = data.get("version", "unknown")
-                    final_revision_date = data.get("revisionDate", "unknown")
-                    metadata_status = "saved to archive_info.json" if data.get("repositoryMetadata") else "not found during fetch, see archive_info.json"
-                    print(f"\n✅ Update complete.")
-                    print(f"🗂 Archive path: {thermoml_path}")
-                    print(f"🔗 Archive URL Used: {final_url}")
-                    print(f"📜 Archive Version: {final_version}")
-                    print(f"🗓️ Archive Revision Date: {final_revision_date}")
-                    print(f"📄 Repository Metadata: {metadata_status}")
-                    print(f"📄 XML files available: {len(xml_files)}")
-                    print("💡 Tip: You can override the archive URL, version, and revision date with environment variables:")
-                    print("   THERMOML_ARCHIVE_URL, THERMOML_ARCHIVE_VERSION, THERMOML_ARCHIVE_REVISION_DATE")
+                    _print_summary(thermoml_path, previous_info)
                     return  # Skip download and extraction
             else:
-                print(f"[DEBUG] Cache not valid: archive_info.json mtime: {mtime}, xml_files: {len(xml_files)}")
-        except Exception as e:
+                print(f"[DEBUG] Cache not valid: archive_info.json mtime: {mtime}, extraction sentinel: {extracted}")
+        except OSError as e:
             print(f"Cache read error: {e}. Will fetch new data.")
     if archive_url_env:
         actual_archive_url = archive_url_env
@@ -156,43 +435,47 @@ def update_archive(thermoml_path=None):
         if archive_revision_date != "unknown (manual URL override)":
             print(f"Using manually specified archive revision date: {archive_revision_date}")
     else:
-        actual_archive_url, archive_version, archive_revision_date, repository_metadata = resolve_archive_url()
+        actual_archive_url, archive_version, archive_revision_date, repository_metadata, nerdm_validators = resolve_archive_url(previous_info)
 
-    combined_tgz = thermoml_path / "ThermoML_all.tgz"
     # Store version and date info in a JSON file
     archive_info_file = thermoml_path / "archive_info.json"
 
+    # Whatever is on disk stays authoritative if the refresh below fails
+    archive_info_data = previous_info
+
+    # Revalidate the previous download of the same URL instead of refetching it
+    request_headers = {}
+    if previous_info.get("archiveURL") == actual_archive_url and sentinel.exists():
+        request_headers = conditional_headers(previous_info)
+
     try:
-        print(f"Downloading combined archive: {actual_archive_url}")
-        download_file(actual_archive_url, combined_tgz)
-
-        if not combined_tgz.exists() or combined_tgz.stat().st_size == 0:
-            raise FileNotFoundError("Downloaded archive is missing or empty.")
-
-        # Check for GZIP magic bytes
-        with open(combined_tgz, 'rb') as f:
-            magic_bytes = f.read(2)
-            if magic_bytes != b'\x1f\x8b':
-                print("Downloaded file does not appear to be a GZIP archive. Attempting to extract anyway.")
-                # Potentially handle non-gzipped tar or other formats if necessary, or just let tarfile try
-
-        print(f"Extracting {combined_tgz} to {thermoml_path}")
-        with tarfile.open(combined_tgz, "r:gz") as tar:
-            safe_extract(tar, thermoml_path)
-        print("Extraction complete.")
-        # Remove the tarball after extraction to save space
-        try:
-            combined_tgz.unlink()
-            print(f"Removed archive file {combined_tgz} after extraction.")
-        except Exception as e:
-            print(f"Warning: Could not remove archive file {combined_tgz}: {e}")
+        print(f"Downloading and extracting combined archive: {actual_archive_url} -> {thermoml_path}")
+        # A partial extraction must not be trusted by the next cache check
+        sentinel.unlink(missing_ok=True)
+        expected_sha256 = _archive_sha256(repository_metadata, actual_archive_url)
+        validators = download_and_extract(actual_archive_url, thermoml_path, request_headers, expected_sha256)
+        if validators is None:
+            # 304 Not Modified: keep the extracted files and their validators
+            sentinel.touch()
+            validators = {name: previous_info.get(name) for name, _ in _VALIDATORS}
+            validators["sha256"] = previous_info.get("sha256")
+            xml_file_count = previous_info.get("xmlFileCount")
+            print("Archive not modified since last download; using cached XML files.")
+        else:
+            print("Extraction complete.")
+            # Count once here so cache hits never have to walk the tree
+            xml_file_count = sum(1 for _ in thermoml_path.rglob("*.xml"))
+            sentinel.touch()
 
         # Save archive info after successful download and extraction
         archive_info_data = {
             "archiveURL": actual_archive_url,
             "version": archive_version,
             "revisionDate": archive_revision_date,
-            "repositoryMetadata": repository_metadata # This could be None
+            "repositoryMetadata": repository_metadata, # This could be None
+            "nerdmValidators": nerdm_validators,
+            "xmlFileCount": xml_file_count,
+            **validators,
         }
         with open(archive_info_file, 'w') as jf:
             json.dump(archive_info_data, jf, indent=4)
@@ -214,43 +497,11 @@ def update_archive(thermoml_path=None):
 
 
     # Summary
-    xml_files = list(thermoml_path.glob("**/*.xml"))
-    print(f"\n✅ Update complete.")
-    print(f"🗂 Archive path: {thermoml_path}")
-    
-    final_url = "unknown"
-    final_version = "unknown"
-    final_revision_date = "unknown"
-    metadata_status = "not found or not saved"
-
-    if archive_info_file.exists():
-        try:
-            with open(archive_info_file, 'r') as jf:
-                data = json.load(jf)
-                final_url = data.get("archiveURL", "unknown")
-                final_version = data.get("version", "unknown")
-                final_revision_date = data.get("revisionDate", "unknown")
-                if data.get("repositoryMetadata"):
-                    metadata_status = f"saved to {archive_info_file}"
-                else:
-                    metadata_status = f"not found during fetch, see {archive_info_file}"
-        except Exception as e:
-            print(f"Could not read archive info file {archive_info_file}: {e}")
-            metadata_status = f"error reading {archive_info_file}"
-
     if archive_url_env:
-        print(f"📦 Archive Source: Manually specified URL ({actual_archive_url})")
+        archive_source = f"Manually specified URL ({actual_archive_url})"
     else:
-        print(f"📦 Archive Source: NIST Page ({NIST_PAGE_URL}) or fallback")
-    
-    print(f"🔗 Archive URL Used: {final_url}")
-    print(f"📜 Archive Version: {final_version}")
-    print(f"🗓️ Archive Revision Date: {final_revision_date}")
-    print(f"📄 Repository Metadata: {metadata_status}")
-    
-    print(f"📄 XML files available: {len(xml_files)}")
-    print("💡 Tip: You can override the archive URL, version, and revision date with environment variables:")
-    print("   THERMOML_ARCHIVE_URL, THERMOML_ARCHIVE_VERSION, THERMOML_ARCHIVE_REVISION_DATE")
+        archive_source = f"NIST Page ({NIST_PAGE_URL}) or fallback"
+    _print_summary(thermoml_path, archive_info_data, archive_source)
 
 if __name__ == "__main__":
     update_archive()
@@ -1,23 +1,42 @@
 import os
+import sys
 import json
-import pandas as pd
-from typing import List, Tuple, Dict, Any, Optional # Added Optional
-from thermopyl.core.parser import parse_thermoml_xml
-from pymatgen.core import Element, Composition # Ensure Composition is imported
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Optional # Added Optional
+from thermopyl.core.parser import parse_thermoml_xml, parse_many
+from thermopyl.core.schema import VAR_KIND_MOLE_FRACTION, VAR_KIND_MASS_FRACTION
 import logging
+from functools import lru_cache
+from importlib.util import find_spec
 from thermopyl import version as thermopyl_version # Added import for version
 
+# pandas and pymatgen are imported on first use: get_fn and the parser do
+# not need them, and together they dominate the import time of this module
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# NERDm metadata in archive_info.json can be several MB; orjson parses it faster
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+@lru_cache(maxsize=None)
 def get_fn(filename: str) -> str:
-    local_path = os.path.join(os.path.dirname(__file__), "..", "data", filename)
+    local_path = os.path.join(_DATA_DIR, filename)
     if os.path.exists(local_path):
         return os.path.abspath(local_path)
     return filename  # fallback if running locally
 
 # Helper function to check pymatgen availability
+# The probe loads pymatgen's periodic table; run it once, not once per record
+@lru_cache(maxsize=None)
 def _is_pymatgen_available() -> bool:
     try:
+        from pymatgen.core import Element, Composition
         # Check for Element and Composition classes
         if not (callable(getattr(Element, "is_valid_symbol", None)) and hasattr(Element("H"), "atomic_mass") and callable(getattr(Composition, "get_el_amt_dict", None))):
             return False
@@ -27,6 +46,58 @@ def _is_pymatgen_available() -> bool:
     except Exception: # Other potential issues during check
         return False
 
+# pymatgen lookups repeat for every record of an alloy dataset; cache them.
+@lru_cache(maxsize=128)
+def _is_valid_symbol(symbol: str) -> bool:
+    from pymatgen.core import Element
+    return Element.is_valid_symbol(symbol)
+
+@lru_cache(maxsize=128)
+def _atomic_mass(symbol: str) -> float:
+    from pymatgen.core import Element
+    return float(Element(symbol).atomic_mass)
+
+@lru_cache(maxsize=4096)
+def _composition_elements(formula: str) -> frozenset:
+    from pymatgen.core import Composition
+    return frozenset(Composition(formula).get_el_amt_dict())
+
+def pretty_formula(frac_dict: Dict[str, float]) -> str:
+    if len(frac_dict) == 1:
+        # Pure component: no filtering or sorting needed
+        (el, amt), = frac_dict.items()
+        if amt > 1e-5 and abs(amt - 1.0) < 1e-3:
+            return el
+    parts = []
+    significant_fracs = {el: amt for el, amt in frac_dict.items() if amt > 1e-5}
+    if not significant_fracs:
+        return ""
+    for el, amt in sorted(significant_fracs.items()):
+        if abs(amt - 1.0) < 1e-3 and len(significant_fracs) == 1:
+            parts.append(f"{el}")
+        else:
+            parts.append(f"{el}{round(amt, 3)}") # Reverted to round() for no trailing zero padding
+    return "".join(parts)
+
+@lru_cache(maxsize=4096)
+def _pretty_formula_cached(items: Tuple[Tuple[str, float], ...]) -> str:
+    # Records of one alloy family repeat the same fractions; key on sorted items
+    return pretty_formula(dict(items))
+
+@lru_cache(maxsize=4096)
+def _join_elements(elements: frozenset) -> str:
+    # Alloy datasets repeat a few element sets; sort and join each set once
+    return ", ".join(sorted(elements))
+
+def _as_list(x: Any) -> list:
+    """Normalize a list-or-scalar field to a list (None -> [])."""
+    return x if type(x) is list else ([x] if x is not None else [])
+
+def _first_author(citation: Optional[Dict[str, Any]]) -> Optional[str]:
+    """First author of a parsed citation, or None."""
+    authors = _as_list(citation.get("sAuthor")) if citation else []
+    return authors[0].split(';', 1)[0].strip() if authors and authors[0] else None
+
 def load_repository_metadata(metadata_path: str = None) -> dict:
     """
     Load repository-level metadata from archive_info.json (NERDm metadata).
@@ -36,154 +107,228 @@ def load_repository_metadata(metadata_path: str = None) -> dict:
         home = os.path.expanduser("~")
         metadata_path = os.path.join(home, ".thermoml", "archive_info.json")
     try:
-        with open(metadata_path, "r", encoding="utf-8") as f:
-            metadata = json.load(f)
+        with open(metadata_path, "rb") as f:
+            metadata = _json_loads(f.read())
         return metadata
     except Exception as e:
-        logger.warning(f"Could not load repository metadata from {metadata_path}: {e}")
+        logger.warning("Could not load repository metadata from %s: %s", metadata_path, e)
         return {}
 
+_MISSING = float("nan")
+_UNSET = object()
+
+# Arrow-backed strings take a fraction of the memory of object columns.
+# pandas >= 3 already infers its own string dtype, leaving no object columns.
+_STRING_DTYPE = "string[pyarrow]" if find_spec("pyarrow") is not None else None
+
+def _compact_strings(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Cast object (Python str) columns to the Arrow string dtype when available."""
+    if _STRING_DTYPE is None or df.empty:
+        return df
+    object_cols = [c for c in df.columns if df[c].dtype == object]
+    if object_cols:
+        df[object_cols] = df[object_cols].astype(_STRING_DTYPE)
+    return df
+
+def _object_strings(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Copy of ``df`` with extension string columns cast back to object.
+
+    PyTables only serializes object string columns; Arrow-backed ones (from
+    :func:`_compact_strings`, or pandas' own ``str`` dtype) fail to write.
+    """
+    import pandas as pd
+
+    string_cols = [c for c in df.columns if isinstance(df[c].dtype, pd.StringDtype)]
+    return df.astype({c: object for c in string_cols}) if string_cols else df
+
+# Column-name sanitization for var_*/prop_* keys: spaces to underscores,
+# drop commas and parentheses (one C-level pass instead of four replaces)
+_KEY_TRANS = str.maketrans({" ": "_", ",": None, "(": None, ")": None})
+
+# A file has a handful of distinct variable/property types but thousands of
+# rows; build (and intern) each column name once instead of once per value.
+@lru_cache(maxsize=None)
+def _var_key(var_type: str) -> str:
+    return sys.intern("var_" + str(var_type).translate(_KEY_TRANS))
+
+@lru_cache(maxsize=None)
+def _prop_key(prop_name: str) -> str:
+    return sys.intern("prop_" + str(prop_name).translate(_KEY_TRANS))
+
+# Records of one entry (and mixtures across files) share a component list;
+# join each distinct list once and keep a single interned copy. Records that
+# come back from worker processes are unpickled with fresh strings, so
+# material_id is re-interned here too.
+@lru_cache(maxsize=None)
+def _join_components(components: tuple) -> str:
+    return sys.intern(", ".join(components))
+
+# Only the last few documents stay resident; repeat builds from a handful of
+# files are what this serves, not whole-archive builds.
+_PARSE_CACHE_SIZE = 8
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_cached(file_path: str, mtime_ns: int, size: int):
+    # Keyed on (path, mtime, size) so an edited or replaced file is re-parsed.
+    # The records are shared between calls and must be treated as read-only.
+    return parse_thermoml_xml(file_path)
+
+def _parse_file(file_path: str):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return parse_thermoml_xml(file_path)  # let the parser report it
+    return _parse_cached(file_path, st.st_mtime_ns, st.st_size)
+
+def _parsed_files(xml_files: List[str], workers: Optional[int] = None):
+    """Yield ``(file_path, records)`` per file, in order.
+
+    Files are parsed in worker processes (see :func:`parse_many`) only when
+    the caller asks for ``workers > 1``; by default they are parsed
+    in-process, where parses are memoized per unchanged file so rebuilding
+    from the same documents in one session skips re-parsing.
+    """
+    serial = workers is None or workers <= 1 or len(xml_files) < 2
+    if serial:
+        for file_path in xml_files:
+            yield file_path, _parse_file(file_path)
+    else:
+        yield from zip(xml_files, parse_many(xml_files, workers=workers))
+
 def build_pandas_dataframe(
-    xml_files: List[str], normalize_alloys: bool = False, repository_metadata: Optional[dict] = None
+    xml_files: List[str], normalize_alloys: bool = False, repository_metadata: Optional[dict] = None,
+    workers: Optional[int] = None,
 ) -> dict:
     """
     Build pandas DataFrames from ThermoML XML files and include repository-level metadata.
     Returns a dict with keys: 'data', 'compounds', 'repository_metadata'.
+
+    Files are parsed in-process by default. Pass ``workers > 1`` to parse them
+    in that many worker processes; as with any multiprocessing code, callers
+    on spawn platforms (macOS, Windows) then need an
+    ``if __name__ == "__main__":`` guard.
     """
+    import pandas as pd
+
+    xml_files = list(xml_files)
     if repository_metadata is None:
         repository_metadata = load_repository_metadata()
 
-    all_records = []
-    all_compounds_data = [] 
+    # Column-oriented accumulation: one list per column, padded with NaN where
+    # a record lacks a (sparse var_*/prop_*) column, exactly as
+    # pd.DataFrame(list_of_dicts) would fill it.
+    columns: Dict[str, list] = {}
+    n_rows = 0
     # Ensure row dictionary can handle Optional[str] for citation fields or use empty string for None
     compound_metadata: Dict[str, Dict[str, Any]] = {} 
 
     # Get thermopyl version
     current_thermopyl_version = thermopyl_version.short_version
 
-    # Define pretty_formula as an inner function or a local helper
-    def pretty_formula(frac_dict: Dict[str, float]) -> str:
-        parts = []
-        significant_fracs = {el: amt for el, amt in frac_dict.items() if amt > 1e-5}
-        if not significant_fracs:
-            return ""
-        for el, amt in sorted(significant_fracs.items()):
-            if abs(amt - 1.0) < 1e-3 and len(significant_fracs) == 1:
-                parts.append(f"{el}")
-            else:
-                parts.append(f"{el}{round(amt, 3)}") # Reverted to round() for no trailing zero padding
-        return "".join(parts)
-
-    for file_path in xml_files:
-        logger.info(f"Processing file: {file_path}")
-        parsed_data = parse_thermoml_xml(file_path)
+    for file_path, parsed_data in _parsed_files(xml_files, workers):
+        logger.info("Processing file: %s", file_path)
         # REMOVED: compound_metadata initialization was here, moved to function start
 
+        # Records of one entry share their component list, and records of one
+        # file their citation: derive the per-row strings only when they change
+        last_components = last_citation = _UNSET
         for record in parsed_data:
+            if record.components is not last_components:
+                last_components = record.components
+                components_str = _join_components(tuple(last_components))
+            if record.citation is not last_citation:
+                last_citation = record.citation
+                cit = last_citation or {}
+                author = _first_author(cit)  # shared with compound metadata below
+                citation_fields = {
+                    "doi": cit.get("sDOI") or "",
+                    "publication_year": cit.get("yrPubYr") or "",
+                    "title": cit.get("sTitle") or "",
+                    "author": author or "",
+                    "journal": cit.get("sPubName") or "",
+                }
+
             # Initialize row with Any to accommodate None then convert to string for DataFrame
             row: Dict[str, Any] = {
-                "material_id": record.material_id,
-                "components": ", ".join(record.components),
+                "material_id": sys.intern(record.material_id),
+                "components": components_str,
                 "thermopyl_version": current_thermopyl_version, 
             }
 
+            if normalize_alloys:
+                mole_fracs = {}
+                mass_fracs = {}
+                current_record_active_elements = set()
+
+            # One pass fills the var_* columns and, when normalizing, the
+            # per-element mole/mass fractions
             for var in record.variable_values:
-                var_key_name = str(var.var_type).replace(" ", "_").replace(",", "").replace("(", "").replace(")", "")
-                row[f"var_{var_key_name}"] = str(var.values[0])
+                row[_var_key(var.var_type)] = var.value
+
+                if normalize_alloys and var.linked_component_org_num is not None:
+                    element_symbol = record.component_id_map.get(var.linked_component_org_num)
+                    if element_symbol:
+                        try:
+                            if _is_valid_symbol(element_symbol):
+                                current_record_active_elements.add(element_symbol)
+                                if var.var_kind == VAR_KIND_MOLE_FRACTION:
+                                    mole_fracs[element_symbol] = var.value
+                                elif var.var_kind == VAR_KIND_MASS_FRACTION:
+                                    mass_fracs[element_symbol] = var.value
+                            else:
+                                logger.warning("Invalid element symbol '%s' from component_id_map for material_id %s. Skipping.", element_symbol, record.material_id)
+                        except ImportError:
+                            current_record_active_elements.add(element_symbol)
+                            if var.var_kind == VAR_KIND_MOLE_FRACTION:
+                                mole_fracs[element_symbol] = var.value
+                            elif var.var_kind == VAR_KIND_MASS_FRACTION:
+                                mass_fracs[element_symbol] = var.value
+                        except Exception as e:
+                            logger.warning("Error validating element symbol '%s': %s. Skipping.", element_symbol, e)
             
             for prop in record.property_values:
-                prop_key_name = str(prop.prop_name).replace(" ", "_").replace(",", "").replace("(", "").replace(")", "")
-                row[f"prop_{prop_key_name}"] = str(prop.values[0])
+                row[_prop_key(prop.prop_name)] = prop.value
 
             # ADDED: Citation information added to the row
             row["source_file"] = record.source_file # This is already a string
-            if record.citation:
-                row["doi"] = record.citation.get("sDOI")
-                row["publication_year"] = record.citation.get("yrPubYr")
-                row["title"] = record.citation.get("sTitle")
-                
-                s_authors_list = record.citation.get("sAuthor") 
-                if s_authors_list and isinstance(s_authors_list, list) and len(s_authors_list) > 0:
-                    first_author_full_string = s_authors_list[0]
-                    row["author"] = first_author_full_string.split(';')[0].strip()
-                else:
-                    row["author"] = None 
-                
-                row["journal"] = record.citation.get("sPubName")
-            else: # No citation object for this record
-                row["doi"] = None
-                row["publication_year"] = None
-                row["title"] = None
-                row["author"] = None
-                row["journal"] = None
-
-            # Convert None values in citation fields to empty strings for DataFrame consistency
-            citation_keys = ["doi", "publication_year", "title", "author", "journal"]
-            for key in citation_keys:
-                if row[key] is None:
-                    row[key] = "" # Or use pd.NA if you prefer pandas' NA type
+            # Missing citation fields are empty strings for DataFrame consistency
+            row.update(citation_fields)
 
             if normalize_alloys:
-                mole_fracs = {}
-                mass_fracs = {}
-                current_record_active_elements = set()
-
-                for var in record.variable_values:
-                    if var.linked_component_org_num is not None:
-                        element_symbol = record.component_id_map.get(var.linked_component_org_num)
-                        if element_symbol:
-                            try:
-                                if Element.is_valid_symbol(element_symbol):
-                                    current_record_active_elements.add(element_symbol)
-                                    if var.var_type.startswith("Mole fraction"):
-                                        mole_fracs[element_symbol] = var.values[0]
-                                    elif var.var_type.startswith("Mass fraction"):
-                                        mass_fracs[element_symbol] = var.values[0]
-                                else:
-                                    logger.warning(f"Invalid element symbol '{element_symbol}' from component_id_map for material_id {record.material_id}. Skipping.")
-                            except ImportError:
-                                current_record_active_elements.add(element_symbol)
-                                if var.var_type.startswith("Mole fraction"):
-                                    mole_fracs[element_symbol] = var.values[0]
-                                elif var.var_type.startswith("Mass fraction"):
-                                    mass_fracs[element_symbol] = var.values[0]
-                            except Exception as e:
-                                logger.warning(f"Error validating element symbol '{element_symbol}': {e}. Skipping.")
-                
-                active_components_str = ""
+                # Elements reported in active_components. Branches below only
+                # re-point this; it is sorted and joined once, after normalization.
+                initial_active_elements = frozenset(current_record_active_elements)
                 normalized_formula_str = ""
 
-                if current_record_active_elements:
-                    active_components_str = ", ".join(sorted(list(current_record_active_elements)))
-                elif record.components:
+                if not initial_active_elements and record.components:
                     all_possible_elements = set()
                     for comp_name in record.components:
                         formula = record.compound_formulas.get(comp_name)
                         if formula:
                             try:
-                                if Element.is_valid_symbol(formula):
+                                if _is_valid_symbol(formula):
                                     all_possible_elements.add(formula)
                             except ImportError:
                                 all_possible_elements.add(formula)
                             except Exception:
                                 pass 
-                    if all_possible_elements:
-                        active_components_str = ", ".join(sorted(list(all_possible_elements)))
-                
-                row["active_components"] = active_components_str # Set initial
+                    initial_active_elements = frozenset(all_possible_elements)
+                active_elements = initial_active_elements
+                row["active_components"] = "" # Placeholder keeps the column order; set after normalization
 
                 try:
                     if not _is_pymatgen_available():
-                        logger.warning(f"Pymatgen not available. Alloy normalization skipped for {record.material_id}.")
+                        logger.warning("Pymatgen not available. Alloy normalization skipped for %s.", record.material_id)
                         row["normalized_formula"] = ""
                         # REMOVED: all_records.append(row)
                         # REMOVED: continue
                         # active_components should be set based on current_record_active_elements or other logic if pymatgen not available
-                        # The existing active_components_str logic before this try-except block handles this.
+                        # The initial active_elements logic before this try-except block handles this.
                     else:
                         # Pymatgen is available, proceed with normalization:
+                        # Elements declared for this material; shared by the mole and mass branches
+                        defined_elements_for_material = frozenset(el for el in record.component_id_map.values() if el and _is_valid_symbol(el))
                         if mole_fracs:
-                            defined_elements_for_material = set(el for el in record.component_id_map.values() if el and Element.is_valid_symbol(el))
                             current_mole_frac_elements = set(mole_fracs.keys()) # Defined before potential modification
                             total_frac = sum(mole_fracs.values()) # Sum before potential modification
 
@@ -195,163 +340,169 @@ def build_pandas_dataframe(
                                     if inferred_fraction > 1e-5:
                                         mole_fracs[missing_element] = inferred_fraction
                                         current_record_active_elements.add(missing_element)
-                                        active_components_str = ", ".join(sorted(list(current_record_active_elements))) # Update active_components_str
+                                        active_elements = current_record_active_elements
                             elif not (0.99 < total_frac < 1.01) and not (abs(total_frac - 0.0) < 1e-9 and not mole_fracs) : # Check if sum is not close to 1 (unless it\'s empty and sum is 0)
-                                logger.warning(f"Mole fractions for {record.material_id} ({mole_fracs}) sum to {total_frac}, not close to 1. Normalization might be inexact.")
+                                logger.warning("Mole fractions for %s (%s) sum to %s, not close to 1. Normalization might be inexact.", record.material_id, mole_fracs, total_frac)
                         
                             # This block is now correctly indented to be part of 'if mole_fracs:'
-                            normalized_formula_str = pretty_formula(mole_fracs)
+                            normalized_formula_str = _pretty_formula_cached(tuple(sorted(mole_fracs.items())))
                             if normalized_formula_str:
                                 try:
-                                    final_elements_in_formula = set(Composition(normalized_formula_str).get_el_amt_dict().keys())
-                                    active_components_str = ", ".join(sorted(list(final_elements_in_formula))) # Update active_components_str
+                                    active_elements = _composition_elements(normalized_formula_str)
                                 except Exception as e: # Catch issues with Composition parsing if pretty_formula is odd
-                                    logger.warning(f"Could not parse formula \'{normalized_formula_str}\' with Pymatgen for active component update: {e}")
+                                    logger.warning("Could not parse formula '%s' with Pymatgen for active component update: %s", normalized_formula_str, e)
                         # End of 'if mole_fracs:' block
                         elif mass_fracs:
-                            logger.debug(f"Material ID {record.material_id}: Processing with mass_fracs. Initial mass_fracs: {mass_fracs}")
-                            logger.debug(f"Material ID {record.material_id}: record.component_id_map: {record.component_id_map}")
+                            logger.debug("Material ID %s: Processing with mass_fracs. Initial mass_fracs: %s", record.material_id, mass_fracs)
+                            logger.debug("Material ID %s: record.component_id_map: %s", record.material_id, record.component_id_map)
                             
-                            valid_mass_fracs = {el: mass for el, mass in mass_fracs.items() if Element.is_valid_symbol(el)}
+                            valid_mass_fracs = {el: mass for el, mass in mass_fracs.items() if _is_valid_symbol(el)}
                             if len(valid_mass_fracs) != len(mass_fracs):
-                                logger.warning(f"Invalid symbols in mass_fracs for {record.material_id}. Using only valid: {valid_mass_fracs}")
+                                logger.warning("Invalid symbols in mass_fracs for %s. Using only valid: %s", record.material_id, valid_mass_fracs)
                             
-                            logger.debug(f"Material ID {record.material_id}: valid_mass_fracs before inference: {valid_mass_fracs}")
+                            logger.debug("Material ID %s: valid_mass_fracs before inference: %s", record.material_id, valid_mass_fracs)
 
                             if not valid_mass_fracs:
                                 normalized_formula_str = ""
-                                # active_components_str is already set based on initial parsing or defaults to ""
+                                # active_elements keeps its initial value
                             else:
                                 # Infer missing mass fraction if applicable
-                                defined_elements_for_material = set(el for el in record.component_id_map.values() if el and Element.is_valid_symbol(el))
-                                logger.debug(f"Material ID {record.material_id}: defined_elements_for_material (from map): {defined_elements_for_material}")
+                                logger.debug("Material ID %s: defined_elements_for_material (from map): %s", record.material_id, defined_elements_for_material)
                                 current_mass_frac_elements = set(valid_mass_fracs.keys())
 
                                 if len(current_mass_frac_elements) < len(defined_elements_for_material):
                                     total_known_mass_frac = sum(valid_mass_fracs.values())
                                     missing_elements_set = defined_elements_for_material - current_mass_frac_elements
-                                    logger.debug(f"Material ID {record.material_id}: total_known_mass_frac: {total_known_mass_frac}, missing_elements_set: {missing_elements_set}")
+                                    logger.debug("Material ID %s: total_known_mass_frac: %s, missing_elements_set: %s", record.material_id, total_known_mass_frac, missing_elements_set)
                                     
                                     if len(missing_elements_set) == 1 and 0 < total_known_mass_frac < 1.0:
                                         missing_element = list(missing_elements_set)[0]
                                         inferred_fraction = 1.0 - total_known_mass_frac
                                         if inferred_fraction > 1e-5: # Only add if significant
                                             valid_mass_fracs[missing_element] = inferred_fraction
-                                            # Update active_components_str if a new element is inferred and added
+                                            # Report the element in active_components if it is inferred and added
                                             current_record_active_elements.add(missing_element)
-                                            active_components_str = ", ".join(sorted(list(current_record_active_elements)))
-                                            logger.info(f"Material ID {record.material_id}: Inferred mass fraction for {missing_element}: {inferred_fraction:.4f} (original mass_fracs: {mass_fracs}, updated valid_mass_fracs: {valid_mass_fracs})")
+                                            active_elements = current_record_active_elements
+                                            logger.info(
+                                                "Material ID %s: Inferred mass fraction for %s: %.4f (original mass_fracs: %s, updated valid_mass_fracs: %s)",
+                                                record.material_id, missing_element, inferred_fraction, mass_fracs, valid_mass_fracs,
+                                            )
                                     elif len(missing_elements_set) > 0 and not (0 < total_known_mass_frac < 1.0):
                                          logger.warning(
-                                        f"Material ID {record.material_id}: Mass fractions (known: {valid_mass_fracs}) sum to {total_known_mass_frac:.4f}. "
-                                        f"{len(missing_elements_set)} component(s) ({missing_elements_set}) are undefined out of {defined_elements_for_material}. "
-                                        f"Cannot reliably infer missing mass fractions."
+                                        "Material ID %s: Mass fractions (known: %s) sum to %.4f. "
+                                        "%d component(s) (%s) are undefined out of %s. "
+                                        "Cannot reliably infer missing mass fractions.",
+                                        record.material_id, valid_mass_fracs, total_known_mass_frac,
+                                        len(missing_elements_set), missing_elements_set, defined_elements_for_material,
                                     )
                             
-                            logger.debug(f"Material ID {record.material_id}: valid_mass_fracs AFTER inference: {valid_mass_fracs}")
+                            logger.debug("Material ID %s: valid_mass_fracs AFTER inference: %s", record.material_id, valid_mass_fracs)
                             
                             # Proceed with conversion using potentially updated valid_mass_fracs
-                            moles = {el: mass / Element(el).atomic_mass for el, mass in valid_mass_fracs.items()}
+                            moles = {el: mass / _atomic_mass(el) for el, mass in valid_mass_fracs.items()}
                             total_moles = sum(moles.values())
                             if total_moles > 1e-9:
-                                final_mole_fracs = {el: amt / total_moles for el, amt in moles.items() if amt / total_moles > 1e-5}
-                                logger.debug(f"Material ID {record.material_id}: final_mole_fracs for pretty_formula: {final_mole_fracs}")
-                                normalized_formula_str = pretty_formula(final_mole_fracs)
+                                # Divide once per element (the filter and the value share it)
+                                final_mole_fracs = {el: frac for el, frac in ((el, amt / total_moles) for el, amt in moles.items()) if frac > 1e-5}
+                                logger.debug("Material ID %s: final_mole_fracs for pretty_formula: %s", record.material_id, final_mole_fracs)
+                                normalized_formula_str = _pretty_formula_cached(tuple(sorted(final_mole_fracs.items())))
                                 if normalized_formula_str:
                                     try:
-                                        final_elements_in_formula = set(Composition(normalized_formula_str).get_el_amt_dict().keys())
-                                        active_components_str = ", ".join(sorted(list(final_elements_in_formula))) # Update active_components_str
+                                        active_elements = _composition_elements(normalized_formula_str)
                                     except Exception as e:
-                                        logger.warning(f"Material ID {record.material_id}: Could not parse formula '{normalized_formula_str}' with Pymatgen for active component update: {e}")
+                                        logger.warning("Material ID %s: Could not parse formula '%s' with Pymatgen for active component update: %s", record.material_id, normalized_formula_str, e)
 
                                 elif valid_mass_fracs: 
-                                     active_components_str = ", ".join(sorted(list(valid_mass_fracs.keys()))) # Update active_components_str
+                                     active_elements = valid_mass_fracs.keys()
                             else:
                                 normalized_formula_str = ""
-                                logger.warning(f"Material ID {record.material_id}: Total moles effectively zero for mass_fracs: {valid_mass_fracs}")
+                                logger.warning("Material ID %s: Total moles effectively zero for mass_fracs: %s", record.material_id, valid_mass_fracs)
                                 if valid_mass_fracs:
-                                    active_components_str = ", ".join(sorted(list(valid_mass_fracs.keys())))
+                                    active_elements = valid_mass_fracs.keys()
                     
                     row["normalized_formula"] = normalized_formula_str
-                    row["active_components"] = active_components_str # Ensure row reflects the final active_components_str from normalization path
-                    logger.debug(
-                        f"Material ID {record.material_id}: Set row normalized_formula='{row.get('normalized_formula', '')}', "
-                        f"active_components='{row.get('active_components', '')}'"
-                    )
-
-                except ImportError: # Should be caught by _is_pymatgen_available, but as a fallback
-                    logger.error(f"Pymatgen import error during normalization for {record.material_id}.")
+
+                except ImportError: # Should be caught by _is_pymatgen_available(), but as a fallback
+                    logger.error("Pymatgen import error during normalization for %s.", record.material_id)
                     row["normalized_formula"] = ""
+                    active_elements = initial_active_elements
                 except Exception as e:
-                    logger.error(f"Normalization failed for {record.material_id}: {e}")
+                    logger.error("Normalization failed for %s: %s", record.material_id, e)
                     row["normalized_formula"] = ""
+                    active_elements = initial_active_elements
+
+                row["active_components"] = _join_elements(frozenset(active_elements))
+                logger.debug(
+                    "Material ID %s: Set row normalized_formula='%s', active_components='%s'",
+                    record.material_id, row.get("normalized_formula", ""), row["active_components"],
+                )
             
-            all_records.append(row) # Row is now complete
+            # Row is now complete
+            for key, value in row.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [_MISSING] * n_rows
+                column.append(value)
+            n_rows += 1
+            if len(row) != len(columns):
+                for column in columns.values():
+                    if len(column) < n_rows:
+                        column.append(_MISSING)
 
             # ADDED: Process compound metadata for this record (using the global compound_metadata dict)
-            current_citation_info_for_compound = {
-                "source_file": record.source_file,
-                "doi": record.citation.get("sDOI") if record.citation else None,
-                "publication_year": record.citation.get("yrPubYr") if record.citation else None,
-                "title": record.citation.get("sTitle") if record.citation else None,
-                "journal": record.citation.get("sPubName") if record.citation else None,
-            }
-            s_authors_list_comp = record.citation.get("sAuthor") if record.citation else None
-            if s_authors_list_comp and isinstance(s_authors_list_comp, list) and len(s_authors_list_comp) > 0:
-                first_author_comp_full = s_authors_list_comp[0]
-                current_citation_info_for_compound["author"] = first_author_comp_full.split(';')[0].strip()
-            else:
-                current_citation_info_for_compound["author"] = None
-
+            # Most formulas are already known, so the citation info is only built on a first sighting
+            current_citation_info_for_compound = None
             for comp_name, comp_formula in record.compound_formulas.items():
-                if comp_formula and comp_formula not in compound_metadata: # Add only if new
-                    compound_metadata[comp_formula] = {
-                        "name": comp_name,
-                        **current_citation_info_for_compound 
+                if not comp_formula or comp_formula in compound_metadata: # Add only if new
+                    continue
+                if current_citation_info_for_compound is None:
+                    current_citation_info_for_compound = {
+                        "source_file": record.source_file,
+                        "doi": cit.get("sDOI"),
+                        "publication_year": cit.get("yrPubYr"),
+                        "title": cit.get("sTitle"),
+                        "journal": cit.get("sPubName"),
+                        "author": author,
                     }
+                compound_metadata[comp_formula] = {"name": comp_name, **current_citation_info_for_compound}
         
         # REMOVED: Old logic for populating all_compounds_data from per-file compound_metadata
 
 
     # Create DataFrames from the collected records
-    df = pd.DataFrame(all_records)
+    df = _compact_strings(pd.DataFrame(columns))
     
     # REMOVED: Old global citation assignment for df (approx lines 240-263 in original)
     # This includes initialization of citation_cols_for_df and the subsequent assignment block.
         
     # ADDED: Build all_compounds_data from the populated global compound_metadata
-    for formula, data in compound_metadata.items():
-        all_compounds_data.append({
-            "symbol": formula, 
-            "name": data["name"],
-            "source_file": data.get("source_file"),
-            "doi": data.get("doi"),
-            "publication_year": data.get("publication_year"),
-            "title": data.get("title"),
-            "author": data.get("author"),
-            "journal": data.get("journal"),
-        })
-    
-    compounds_df = pd.DataFrame(all_compounds_data)
+    compound_fields = ("source_file", "doi", "publication_year", "title", "author", "journal")
+    compound_columns: Dict[str, list] = {"symbol": list(compound_metadata)}
+    compound_columns["name"] = [data["name"] for data in compound_metadata.values()]
+    for key in compound_fields:
+        compound_columns[key] = [data.get(key) for data in compound_metadata.values()]
+
+    compounds_df = _compact_strings(pd.DataFrame(compound_columns)) if compound_metadata else pd.DataFrame()
     # REMOVED: Old global citation assignment for compounds_df (approx lines 265-281 in original)
     # This includes initialization of citation_cols_for_comp_df and the subsequent assignment block.
     
-    # Deduplicate compounds_df if necessary, e.g., based on 'symbol'
-    if not compounds_df.empty:
-        compounds_df = compounds_df.drop_duplicates(subset=['symbol']).reset_index(drop=True)
+    # compound_metadata is keyed by formula, so symbols should already be unique
+    if not compounds_df.empty and not compounds_df["symbol"].is_unique:
+        duplicates = compounds_df.loc[compounds_df["symbol"].duplicated(), "symbol"].unique().tolist()
+        raise ValueError(f"Duplicate compound symbols in compounds table: {duplicates}")
 
-    logger.debug(f"Final DataFrame columns: {df.columns.tolist()}")
-    if normalize_alloys and not df.empty:
+    logger.debug("Final DataFrame columns: %s", df.columns.tolist())
+    if normalize_alloys and not df.empty and logger.isEnabledFor(logging.DEBUG):
         if "normalized_formula" in df.columns:
-            logger.debug(f"Sample of normalized_formula: {df['normalized_formula'].head().tolist()}")
+            logger.debug("Sample of normalized_formula: %s", df["normalized_formula"].head().tolist())
         else:
             logger.debug("'normalized_formula' column not present in the final DataFrame.")
         if "active_components" in df.columns:
-            logger.debug(f"Sample of active_components: {df['active_components'].head().tolist()}")
+            logger.debug("Sample of active_components: %s", df["active_components"].head().tolist())
         else:
             logger.debug("'active_components' column not present in the final DataFrame.")
 
-    logger.debug(f"Repository metadata included in output: {repository_metadata}")
+    logger.debug("Repository metadata included in output: %s", repository_metadata)
     return {
         "data": df,
         "compounds": compounds_df,
@@ -359,12 +510,106 @@ def build_pandas_dataframe(
     }
 
 
-def pandas_dataframe(path: str) -> pd.DataFrame:
+def write_pandas_dataframe(
+    path: str,
+    data: "pd.DataFrame",
+    compounds: Optional["pd.DataFrame"] = None,
+    complevel: int = 5,
+    data_columns: Optional[List[str]] = None,
+) -> None:
+    """
+    Write ``data.h5`` (and ``compound_name_to_formula.h5`` if ``compounds`` is
+    given) to ``path`` in the layout :func:`pandas_dataframe` reads.
+
+    Stores are written with ``format="table"`` (so ``columns``/``where`` can be
+    pushed down on load) and blosc:zstd compression, which shrinks the sparse
+    var_*/prop_* columns several-fold and decompresses faster than the extra
+    bytes would take to read. ``data_columns`` names the ``data.h5`` columns
+    to index so a ``where`` filter on them is evaluated by PyTables on disk
+    (e.g. ``["var_Temperature_K"]``). String columns are written as object
+    columns, the only string layout PyTables supports.
+    """
+    import pandas as pd
+
+    os.makedirs(path, exist_ok=True)
+    outputs = [("data.h5", data, data_columns)]
+    if compounds is not None:
+        outputs.append(("compound_name_to_formula.h5", compounds, None))
+    for filename, df, indexed in outputs:
+        with pd.HDFStore(os.path.join(path, filename), mode="w", complib="blosc:zstd", complevel=complevel) as store:
+            store.put("data", _object_strings(df), format="table", data_columns=indexed)
+
+
+def write_pandas_dataframe_parquet(
+    path: str,
+    data: "pd.DataFrame",
+    compounds: Optional["pd.DataFrame"] = None,
+    compression: str = "zstd",
+) -> None:
+    """
+    Write ``data.parquet`` (and ``compound_name_to_formula.parquet`` if
+    ``compounds`` is given) to ``path`` (requires pyarrow).
+
+    The Parquet counterpart of :func:`write_pandas_dataframe`, in the layout
+    :func:`pandas_dataframe_parquet` reads.
+    """
+    os.makedirs(path, exist_ok=True)
+    outputs = [("data.parquet", data)]
+    if compounds is not None:
+        outputs.append(("compound_name_to_formula.parquet", compounds))
+    for filename, df in outputs:
+        df.to_parquet(os.path.join(path, filename), engine="pyarrow", compression=compression)
+
+
+def pandas_dataframe(
+    path: str,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    chunksize: Optional[int] = None,
+) -> "pd.DataFrame":
+    """
+    Load ``data.h5`` from ``path``.
+
+    ``columns`` and ``where`` are pushed down to PyTables so only the selected
+    columns/rows are read; like ``chunksize`` (which returns an iterator of
+    DataFrames) they require a store written with ``format="table"``.
+
+    A ``data.parquet`` in the same directory is ignored; read it explicitly
+    with :func:`pandas_dataframe_parquet`.
+    """
+    import pandas as pd
+
     try:
-        result = pd.read_hdf(os.path.join(path, "data.h5"), key="data")
+        result = pd.read_hdf(
+            os.path.join(path, "data.h5"), key="data", columns=columns, where=where, chunksize=chunksize
+        )
         if isinstance(result, pd.Series):
             result = result.to_frame().T
         return result
-    except Exception as e:
-        print(f"Failed to load DataFrame from HDF5: {e}")
+    except Exception:
+        logger.exception("Failed to load DataFrame from HDF5")
+        return pd.DataFrame()
+
+
+def pandas_dataframe_parquet(
+    path: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[list] = None,
+) -> "pd.DataFrame":
+    """
+    Load ``data.parquet`` from ``path`` (requires pyarrow).
+
+    Parquet's dictionary-encoded string columns make it much smaller and faster
+    to read than ``data.h5`` for ThermoML tables; write it with
+    :func:`write_pandas_dataframe_parquet`.
+    ``columns`` and ``filters`` are pushed down to the Parquet reader.
+    """
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(
+            os.path.join(path, "data.parquet"), engine="pyarrow", columns=columns, filters=filters
+        )
+    except Exception:
+        logger.exception("Failed to load DataFrame from Parquet")
         return pd.DataFrame()
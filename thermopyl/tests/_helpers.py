@@ -0,0 +1,28 @@
+"""Schema-validation helpers shared by the test modules and archive script."""
+from functools import lru_cache
+from typing import Optional
+
+from lxml import etree
+
+# ThermoML documents can be large; skip the per-document ID table
+_XML_PARSER = etree.XMLParser(huge_tree=True, collect_ids=False)
+
+
+@lru_cache(maxsize=None)
+def load_schema(schema_path: str) -> etree.XMLSchema:
+    """Compile ``schema_path`` once per process (lxml schemas can't be pickled)."""
+    return etree.XMLSchema(etree.parse(str(schema_path)))
+
+
+def validate_xml(schema: etree.XMLSchema, file_path) -> None:
+    """Raise ``etree.DocumentInvalid`` if ``file_path`` does not match ``schema``."""
+    schema.assertValid(etree.parse(str(file_path), parser=_XML_PARSER))
+
+
+def validation_error(schema_path: str, file_path) -> Optional[str]:
+    """Return None if ``file_path`` is valid against ``schema_path``, else the error."""
+    try:
+        validate_xml(load_schema(schema_path), file_path)
+        return None
+    except (etree.DocumentInvalid, etree.XMLSyntaxError, OSError) as e:
+        return str(e)
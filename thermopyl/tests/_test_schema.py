@@ -1,13 +1,11 @@
 import os
-import xmlschema
+from lxml import etree
 
-def validate_xml(schema_path, file_path):
-    schema = xmlschema.XMLSchema(schema_path)
-    schema.validate(file_path)
+from thermopyl.core.utils import get_fn
+from thermopyl.tests._helpers import validate_xml
 
-def test_all_thermoml_files_validate():
-    schema_path = "ThermoML.xsd"
-    data_dir = "thermopyl/data"
+def test_all_thermoml_files_validate(thermoml_schema):
+    data_dir = os.path.dirname(get_fn("ThermoML.xsd"))
     xml_files = [f for f in os.listdir(data_dir) if f.endswith(".xml")]
 
     assert xml_files, "No XML files found for validation."
@@ -16,8 +14,8 @@ def test_all_thermoml_files_validate():
     for xml_file in xml_files:
         full_path = os.path.join(data_dir, xml_file)
         try:
-            validate_xml(schema_path, full_path)
-        except xmlschema.XMLSchemaValidationError as e:
+            validate_xml(thermoml_schema, full_path)
+        except etree.DocumentInvalid as e:
             errors.append(f"{xml_file} failed: {e}")
 
     assert not errors, "Schema validation failed:\n" + "\n".join(errors)
@@ -0,0 +1,96 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+from thermopyl.core.parser import CACHE_DIR_ENV
+from thermopyl.core.utils import build_pandas_dataframe, get_fn
+from thermopyl.tests._helpers import load_schema
+
+# Bundled ThermoML documents exercised by the suite. Only names live at module
+# scope; paths are resolved by the fixtures, so collection does no disk I/O.
+TEST_FILENAMES = (
+    "je8006138.xml",
+    "acs.jced.8b00745.xml",
+   # "acs.jced.8b00050.xml",
+    "j.tca.2012.07.033.xml",
+    "j.tca.2007.01.009.xml",
+)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _thermopyl_logging():
+    """Send parser/utils log records to the console, once for the session.
+
+    The level defaults to DEBUG; set THERMOPYL_TEST_LOG_LEVEL (e.g. WARNING
+    on CI) to skip formatting every per-record debug message.
+    """
+    level = os.environ.get("THERMOPYL_TEST_LOG_LEVEL", "DEBUG").upper()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for name in ("thermopyl.core.parser", "thermopyl.core.utils"):
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+        logger.propagate = False
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _thermopyl_cache_dir(tmp_path_factory):
+    """Keep validation markers in a session temp dir, never the user's cache."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("thermopyl_cache")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture(scope="session")
+def thermoml_schema():
+    """ThermoML.xsd compiled once (by libxml2) for the whole session."""
+    return load_schema(get_fn("ThermoML.xsd"))
+
+
+@pytest.fixture(scope="session")
+def xml_files():
+    """Absolute paths of the bundled test documents."""
+    return tuple(get_fn(f) for f in TEST_FILENAMES)
+
+
+@pytest.fixture(scope="session")
+def xml_data_files():
+    """Every XML document in the bundled data directory, in sorted order."""
+    data_dir = Path(get_fn("ThermoML.xsd")).parent
+    return tuple(str(p) for p in sorted(data_dir.glob("*.xml")))
+
+
+@pytest.fixture(scope="session")
+def malformed_xml_path(tmp_path_factory):
+    """A truncated, schema-invalid document for negative tests, written once."""
+    path = tmp_path_factory.mktemp("malformed") / "malformed.xml"
+    path.write_text("<Invalid><ThisIsNot>Proper XML</ThisIsNot>")
+    return str(path)
+
+
+@pytest.fixture(params=TEST_FILENAMES)
+def xml_file(request):
+    """Each bundled test document in turn (parametrizes the requesting test)."""
+    return get_fn(request.param)
+
+
+@lru_cache(maxsize=None)
+def _cached_build(files, normalize_alloys=False):
+    return build_pandas_dataframe(list(files), normalize_alloys=normalize_alloys)
+
+
+@pytest.fixture(scope="session")
+def cached_build():
+    """``build_pandas_dataframe`` memoized on ``(files_tuple, normalize_alloys)``.
+
+    Several tests build frames from the same documents; each distinct build
+    runs once per session. Results are shared, so treat them as read-only.
+    """
+    return _cached_build
@@ -1,55 +1,21 @@
 import os
-import tempfile
-import shutil
 import pandas as pd
-import xmlschema
+import pytest
+from lxml import etree
 from pymatgen.core import Composition
-import logging # Added logging import
 
 from thermopyl.core.chemistry_utils import (
     count_atoms,
+    count_atoms_batch,
     count_atoms_in_set,
+    count_atoms_in_set_batch,
     formula_to_element_counts
 )
-from thermopyl.core.utils import get_fn, build_pandas_dataframe, pandas_dataframe
-from thermopyl.core.parser import parse_thermoml_xml
+from thermopyl.core.utils import get_fn, build_pandas_dataframe, pandas_dataframe, pandas_dataframe_parquet, write_pandas_dataframe, write_pandas_dataframe_parquet
+from thermopyl.core.parser import CACHE_DIR_ENV, _validation_cache_dir, parse_thermoml_xml, parse_many
+from thermopyl.tests._helpers import validate_xml
 from thermopyl.core.schema import NumValuesRecord, VariableValue # Ensure these are imported for the tests that use them
 
-# Configure logging for utils to see errors from build_pandas_dataframe
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-# Configure utils logger
-utils_logger = logging.getLogger('thermopyl.core.utils')
-utils_logger.setLevel(logging.DEBUG) # Set to DEBUG to capture all levels of logs
-if not utils_logger.handlers: # Avoid adding multiple handlers if tests are run multiple times
-    utils_handler = logging.StreamHandler() # Log to console
-    utils_handler.setFormatter(formatter)
-    utils_logger.addHandler(utils_handler)
-utils_logger.propagate = False # To prevent logs from being passed to the root logger if it has handlers
-
-# Configure parser logger (optional, but good for consistency if parser issues are suspected elsewhere)
-parser_logger = logging.getLogger('thermopyl.core.parser')
-parser_logger.setLevel(logging.DEBUG)
-if not parser_logger.handlers:
-    parser_handler = logging.StreamHandler()
-    parser_handler.setFormatter(formatter)
-    parser_logger.addHandler(parser_handler) # Added handler
-    parser_logger.propagate = False # Added propagate setting
-
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', 1000)
-pd.set_option('display.max_colwidth', None)
-
-
-test_files = [get_fn(f) for f in [
-    "je8006138.xml",
-    "acs.jced.8b00745.xml",
-   # "acs.jced.8b00050.xml",
-    "j.tca.2012.07.033.xml",
-    "j.tca.2007.01.009.xml"
-]]
-
 
 formula = "C3H5N2OClBr"
 reference_atom_count = 13
@@ -64,101 +30,189 @@ def test_count_atoms_in_set():
 def test_formula_to_element_counts():
     assert formula_to_element_counts(formula) == reference_element_counts
 
-def test_build_pandas_dataframe():
-    tmpdir = tempfile.mkdtemp()
-    try:
-        filenames = [get_fn(f) for f in test_files]
-        result = build_pandas_dataframe(filenames)
-        data = result["data"]
-        compounds = result["compounds"]
-        repository_metadata = result["repository_metadata"]
-
-        print("\n=== DEBUG OUTPUT ===")
-        print(f"Parsed {len(data)} records")
-        print(f"DataFrame columns: {list(data.columns)}")
-        print(f"Compound entries: {len(compounds)}")
-        print(f"Repository metadata: {repository_metadata}")
-        print(f"First few entries:\n{data.head()}")
-        print("=== END DEBUG OUTPUT ===\n")
-
-        data.to_hdf(os.path.join(tmpdir, 'data.h5'), key='data')
-        compounds.to_hdf(os.path.join(tmpdir, 'compound_name_to_formula.h5'), key='data')
-        df = pandas_dataframe(tmpdir)
-        assert not df.empty
-    finally:
-        shutil.rmtree(tmpdir)
-
-def test_schema_validation():
-    for f in test_files:
-        entries = parse_thermoml_xml(get_fn(f))
-        assert len(entries) > 0
-
-def test_compound_parsing():
+def test_count_atoms_batch():
+    formulas = pd.Series([formula, "H2O", None, formula])
+    counts = count_atoms_batch(formulas)
+    assert counts.tolist() == [reference_atom_count, 3, pd.NA, reference_atom_count]
+    in_set = count_atoms_in_set_batch(formulas, ["C", "H"])
+    assert in_set.tolist() == [8, 2, pd.NA, 8]
+
+def test_build_pandas_dataframe(xml_files, tmp_path):
+    result = build_pandas_dataframe(list(xml_files))
+    data = result["data"]
+    compounds = result["compounds"]
+    repository_metadata = result["repository_metadata"]
+
+    print("\n=== DEBUG OUTPUT ===")
+    print(f"Parsed {len(data)} records")
+    print(f"DataFrame columns: {list(data.columns)}")
+    print(f"Compound entries: {len(compounds)}")
+    print(f"Repository metadata: {repository_metadata}")
+    print(f"First few entries:\n{data.head()}")
+    print("=== END DEBUG OUTPUT ===\n")
+
+    numeric_cols = [c for c in data.columns if c.startswith(("var_", "prop_"))]
+    assert numeric_cols and all(pd.api.types.is_float_dtype(data[c]) for c in numeric_cols)
+
+    write_pandas_dataframe(tmp_path, data, compounds)
+    df = pandas_dataframe(tmp_path)
+    assert not df.empty
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+
+    # Regression guard: the compressed store must stay well below an
+    # uncompressed table-format write of the same frame
+    uncompressed = tmp_path / "uncompressed"
+    write_pandas_dataframe(uncompressed, data, complevel=0)
+    assert os.path.getsize(os.path.join(tmp_path, "data.h5")) < os.path.getsize(uncompressed / "data.h5") / 2
+
+def test_pandas_dataframe_where_pushdown(xml_files, tmp_path):
+    data = build_pandas_dataframe(list(xml_files), repository_metadata={})["data"]
+    write_pandas_dataframe(tmp_path, data, data_columns=["var_Temperature_K"])
+    subset = pandas_dataframe(tmp_path, columns=["material_id", "var_Temperature_K"], where="var_Temperature_K == 293.15")
+    expected = data.loc[data["var_Temperature_K"] == 293.15, ["material_id", "var_Temperature_K"]]
+    assert not subset.empty
+    pd.testing.assert_frame_equal(subset, expected, check_dtype=False)
+
+def test_write_pandas_dataframe_arrow_strings(xml_files, tmp_path):
+    pytest.importorskip("pyarrow")
+    result = build_pandas_dataframe(list(xml_files), repository_metadata={})
+    data = result["data"].astype({"material_id": "string[pyarrow]", "doi": "string[pyarrow]"})
+    compounds = result["compounds"].astype({"doi": "string[pyarrow]"})
+    write_pandas_dataframe(tmp_path, data, compounds)
+    pd.testing.assert_frame_equal(pandas_dataframe(tmp_path), data, check_dtype=False)
+    stored = pd.read_hdf(os.path.join(tmp_path, "compound_name_to_formula.h5"), key="data")
+    pd.testing.assert_frame_equal(stored, compounds, check_dtype=False)
+
+def test_pandas_dataframe_ignores_parquet(xml_files, tmp_path):
+    data = build_pandas_dataframe(list(xml_files), repository_metadata={})["data"]
+    # A stale or unrelated data.parquet must not shadow the HDF5 store
+    (tmp_path / "data.parquet").write_bytes(b"not a parquet file")
+    write_pandas_dataframe(tmp_path, data)
+    pd.testing.assert_frame_equal(pandas_dataframe(tmp_path), data, check_dtype=False)
+
+def test_pandas_dataframe_parquet(xml_files, tmp_path):
+    pytest.importorskip("pyarrow")
+    data = build_pandas_dataframe(list(xml_files), repository_metadata={})["data"]
+    write_pandas_dataframe_parquet(tmp_path, data)
+    pd.testing.assert_frame_equal(pandas_dataframe_parquet(tmp_path), data, check_dtype=False)
+    assert list(pandas_dataframe_parquet(tmp_path, columns=["material_id"]).columns) == ["material_id"]
+
+def test_build_pandas_dataframe_parallel_matches_serial(xml_files):
+    filenames = list(xml_files)
+    serial = build_pandas_dataframe(filenames, repository_metadata={}, workers=1)
+    parallel = build_pandas_dataframe(filenames, repository_metadata={}, workers=2)
+    pd.testing.assert_frame_equal(parallel["data"], serial["data"])
+    pd.testing.assert_frame_equal(parallel["compounds"], serial["compounds"])
+
+def test_build_pandas_dataframe_serial_by_default(xml_files, mocker):
+    parse_many_spy = mocker.patch("thermopyl.core.utils.parse_many")
+    result = build_pandas_dataframe(list(xml_files) * 10, repository_metadata={})
+    assert not result["data"].empty
+    parse_many_spy.assert_not_called()
+
+def test_parse_many_missing_schema_fails_per_file(xml_files, tmp_path):
+    missing = str(tmp_path / "missing.xsd")
+    with pytest.raises(OSError):
+        list(parse_many(list(xml_files), xsd_path=missing, workers=2))
+
+def test_schema_validation(xml_file):
+    entries = parse_thermoml_xml(xml_file)
+    assert len(entries) > 0
+
+def test_validation_cache_is_opt_in(xml_files, tmp_path, monkeypatch):
+    path = xml_files[0]
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home / ".cache"))
+    monkeypatch.delenv(CACHE_DIR_ENV)
+    assert _validation_cache_dir() is None
+    parse_thermoml_xml(path)
+    assert not any(home.rglob("*")), "parsing without the env var wrote files"
+
+    cache = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(cache))
+    first = parse_thermoml_xml(path)
+    assert len(os.listdir(cache / "validated")) == 1
+    assert parse_thermoml_xml(path) == first  # served past the marker
+
+def test_parse_cache_sees_edited_file(xml_files, tmp_path):
+    path = tmp_path / "copy.xml"
+    path.write_bytes(open(xml_files[0], "rb").read())
+    before = build_pandas_dataframe([str(path)], repository_metadata={}, workers=1)["data"]
+    # Drop the last data point; the rewrite changes size and mtime
+    text = path.read_text()
+    cut = text.rindex("<NumValues>")
+    path.write_text(text[:cut] + text[text.index("</NumValues>", cut) + len("</NumValues>"):])
+    after = build_pandas_dataframe([str(path)], repository_metadata={}, workers=1)["data"]
+    assert len(after) == len(before) - 1
+
+def test_parse_entry_bugs_propagate(xml_files, mocker):
+    mocker.patch("thermopyl.core.parser._parse_entry", side_effect=ValueError("bad nOrgNum"))
+    assert parse_thermoml_xml(xml_files[0]) == []  # bad data: entries skipped
+    mocker.patch("thermopyl.core.parser._parse_entry", side_effect=KeyError("bug"))
+    with pytest.raises(KeyError):
+        parse_thermoml_xml(xml_files[0])
+
+def test_parse_many_matches_serial(xml_files):
+    paths = list(xml_files)
+    parallel = list(parse_many(paths, workers=2, chunksize=1))
+    assert parallel == [parse_thermoml_xml(p) for p in paths]
+
+def test_compound_parsing(xml_file, cached_build):
     expected_compounds = {
         "je8006138.xml": ["C6H12", "C6H14", "C24H51O4P"],
-        # "acs.jced.8b00050.xml": ["C12H18N2O3S", "C10H13ClN2O3S"],  # Commented out to match test_files
+        # "acs.jced.8b00050.xml": ["C12H18N2O3S", "C10H13ClN2O3S"],  # Commented out to match TEST_FILENAMES
         "acs.jced.8b00745.xml": ["C2H6O", "C31H52O3", "CO2"],
         "j.tca.2012.07.033.xml": ["Bi", "Zn", "Al"],
         "j.tca.2007.01.009.xml": ["Pb", "Cd", "Sn", "Zn"]
     }
-    for f in test_files:
-        result = build_pandas_dataframe([get_fn(f)], normalize_alloys=True)
-        compounds_df = result["compounds"]
-        print(f"compound_df columns for {f}:", compounds_df.columns)
-        # Ensure 'symbol' column exists before trying to access it
-        if 'symbol' not in compounds_df.columns:
-            raise AssertionError(f"'symbol' column not found in compounds_df for {f}. Columns: {compounds_df.columns}")
-        formulas = compounds_df['symbol'].tolist() # Changed 'formula' to 'symbol'
-        expected = expected_compounds.get(os.path.basename(f), [])
-        assert sorted(formulas) == sorted(expected), f"Mismatch for {f}"
-
-def test_long_format_output():
-    for f in test_files:
-        result = build_pandas_dataframe([get_fn(f)])
-        data = result["data"]
-        assert not data.empty, f"Dataframe is empty for {f}"
-        # Add more specific assertions based on expected long_form behavior if re-implemented
-
-def test_malformed_handling():
-    malformed_path = tempfile.mktemp(suffix=".xml")
-    with open(malformed_path, "w") as f:
-        f.write("<Invalid><ThisIsNot>Proper XML</ThisIsNot>")
-    try:
-        build_pandas_dataframe([malformed_path])
-        assert False, "Expected exception not raised for malformed XML."
-    except Exception:
-        pass
-
-def validate_xml(schema_path, file_path):
-    schema = xmlschema.XMLSchema(schema_path)
-    schema.validate(file_path)
-
-def test_all_thermoml_files_validate():
-    schema_path = get_fn("ThermoML.xsd")
+    f = xml_file
+    result = cached_build((f,), True)
+    compounds_df = result["compounds"]
+    print(f"compound_df columns for {f}:", compounds_df.columns)
+    # Ensure 'symbol' column exists before trying to access it
+    if 'symbol' not in compounds_df.columns:
+        raise AssertionError(f"'symbol' column not found in compounds_df for {f}. Columns: {compounds_df.columns}")
+    formulas = compounds_df['symbol'].tolist() # Changed 'formula' to 'symbol'
+    expected = expected_compounds.get(os.path.basename(f), [])
+    assert sorted(formulas) == sorted(expected), f"Mismatch for {f}"
+
+def test_long_format_output(xml_file, cached_build):
+    result = cached_build((xml_file,), False)
+    data = result["data"]
+    assert not data.empty, f"Dataframe is empty for {xml_file}"
+    # Add more specific assertions based on expected long_form behavior if re-implemented
+
+def test_malformed_handling(malformed_xml_path):
+    with pytest.raises(Exception):
+        build_pandas_dataframe([malformed_xml_path])
+
+def test_all_thermoml_files_validate(thermoml_schema, xml_files):
     errors = []
-    for f in test_files:
+    for f in xml_files:
         try:
-            validate_xml(schema_path, get_fn(f))
-        except xmlschema.XMLSchemaValidationError as e:
+            validate_xml(thermoml_schema, f)
+        except etree.DocumentInvalid as e:
             errors.append(f"{f} failed: {e}")
     assert not errors, "Schema validation failed:\n" + "\n".join(errors)
 
-def test_alloy_composition_normalization():
-    for f in ["j.tca.2012.07.033.xml", "j.tca.2007.01.009.xml"]:
-        print(f"\nChecking {f}")
-        result = build_pandas_dataframe([get_fn(f)], normalize_alloys=True)
-        data = result["data"]
-        print("Data columns:", data.columns)
-        assert "normalized_formula" in data.columns, f"'normalized_formula' not found in {f}"
-
-        formulas = data["normalized_formula"].dropna().unique()
-        for formula in formulas:
-            print(f"Trying to parse formula: {formula}")
-            try:
-                comp = Composition(formula)
-                assert isinstance(comp, Composition)
-            except Exception as e:
-                raise AssertionError(f"Failed to parse normalized formula '{formula}' from {f}: {e}")
+@pytest.mark.parametrize("f", ["j.tca.2012.07.033.xml", "j.tca.2007.01.009.xml"])
+def test_alloy_composition_normalization(f, cached_build):
+    print(f"\nChecking {f}")
+    result = cached_build((get_fn(f),), True)
+    data = result["data"]
+    print("Data columns:", data.columns)
+    assert "normalized_formula" in data.columns, f"'normalized_formula' not found in {f}"
+
+    formulas = data["normalized_formula"].dropna().unique()
+    for formula in formulas:
+        print(f"Trying to parse formula: {formula}")
+        try:
+            comp = Composition(formula)
+            assert isinstance(comp, Composition)
+        except Exception as e:
+            raise AssertionError(f"Failed to parse normalized formula '{formula}' from {f}: {e}")
 
             
             
@@ -1,21 +1,30 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-import xmlschema
+
+from thermopyl.tests._helpers import validation_error
 
 def find_archive_dir():
     return Path(os.environ.get("THERMOML_PATH", Path.home() / ".thermoml"))
 
 def list_xml_files(directory):
-    return sorted(directory.glob("*.xml"))
+    if not os.path.isdir(directory):
+        return []  # like glob on a missing directory
+    # scandir reports names and entry types without a stat per file
+    with os.scandir(directory) as entries:
+        return sorted(Path(e.path) for e in entries if e.name.endswith(".xml") and e.is_file())
 
-def validate_with_schema(xml_files, schema_path, limit=10):
-    schema = xmlschema.XMLSchema(schema_path)
-    for xml_file in xml_files[:limit]:
-        try:
-            schema.validate(xml_file)
-            print(f"✅ Valid: {xml_file.name}")
-        except Exception as e:
-            print(f"❌ Invalid: {xml_file.name} — {e}")
+def validate_with_schema(xml_files, schema_path, limit=10, workers=None):
+    # Files are independent, so libxml2 validation runs in worker processes
+    xml_files = xml_files[:limit]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        errors = pool.map(partial(validation_error, str(schema_path)), [str(f) for f in xml_files])
+        for xml_file, error in zip(xml_files, errors):
+            if error is None:
+                print(f"✅ Valid: {xml_file.name}")
+            else:
+                print(f"❌ Invalid: {xml_file.name} — {error}")
 
 if __name__ == "__main__":
     archive_path = find_archive_dir()
@@ -0,0 +1,95 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from thermopyl.core.update_archive import safe_extract
+
+
+def _add(tar, name, data=None, mtime=0):
+    info = tarfile.TarInfo(name)
+    info.mtime = mtime
+    if data is None:
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+        tar.addfile(info)
+    else:
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+
+
+def test_safe_extract_matches_extractall_ordering(tmp_path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        _add(tar, "d", mtime=1_000_000)
+        for i in range(20):
+            _add(tar, f"d/f{i}.xml", b"x" * i)
+        _add(tar, "d/dup.xml", b"first")
+        _add(tar, "d/dup.xml", b"second")
+    buf.seek(0)
+    with tarfile.open(fileobj=buf, mode="r|") as tar:
+        safe_extract(tar, tmp_path, workers=4)
+
+    # The last member with a given name wins, as with extractall
+    assert (tmp_path / "d" / "dup.xml").read_bytes() == b"second"
+    assert (tmp_path / "d" / "f19.xml").read_bytes() == b"x" * 19
+    # Directory attributes are applied after its files are written
+    assert os.stat(tmp_path / "d").st_mtime == 1_000_000
+
+
+class _FakeResponse:
+    status_code = 200
+    headers = {"ETag": '"v2"'}
+
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+def _archive(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data in files.items():
+            _add(tar, name, data)
+    return buf.getvalue()
+
+
+def test_download_and_extract_verifies_before_replacing(tmp_path, mocker):
+    import hashlib
+    from thermopyl.core import update_archive
+
+    dest = tmp_path / "thermoml"
+    (dest / "ThermoML").mkdir(parents=True)
+    (dest / "ThermoML" / "old.xml").write_bytes(b"verified")
+    (dest / "archive_info.json").write_text("{}")
+    body = _archive({"ThermoML/new.xml": b"fresh"})
+    get = mocker.patch.object(update_archive._SESSION, "get")
+
+    # A digest mismatch leaves the previous tree untouched and no staging dirs
+    get.return_value = _FakeResponse(body)
+    with pytest.raises(ValueError):
+        update_archive.download_and_extract("https://example.invalid/a.tgz", dest, expected_sha256="0" * 64)
+    assert (dest / "ThermoML" / "old.xml").read_bytes() == b"verified"
+    assert not (dest / "ThermoML" / "new.xml").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["thermoml"]
+
+    # A matching digest swaps the archive's tree in and keeps other entries
+    get.return_value = _FakeResponse(body)
+    info = update_archive.download_and_extract(
+        "https://example.invalid/a.tgz", dest, expected_sha256=hashlib.sha256(body).hexdigest()
+    )
+    assert info["sha256"] == hashlib.sha256(body).hexdigest()
+    assert (dest / "ThermoML" / "new.xml").read_bytes() == b"fresh"
+    assert not (dest / "ThermoML" / "old.xml").exists()
+    assert (dest / "archive_info.json").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["thermoml"]